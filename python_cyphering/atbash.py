@@ -1,3 +1,10 @@
+import os
+import sys
+
+# The translate engine is shared with the Caesar tools in python_decyphering
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python_decyphering'))
+from caesar_core import ATBASH_BYTE_TABLE, atbash, translate_main
+
 def atbash_cipher(text):
     """
     Encrypts or decrypts text using the Atbash cipher.
@@ -10,20 +17,14 @@ def atbash_cipher(text):
     Returns:
         str: The processed text after applying the Atbash cipher.
     """
-    result = ""
-    for char in text:
-        if 'a' <= char <= 'z':
-            # Reverse the lowercase alphabet
-            result += chr(ord('a') + (ord('z') - ord(char)))
-        elif 'A' <= char <= 'Z':
-            # Reverse the uppercase alphabet
-            result += chr(ord('A') + (ord('Z') - ord(char)))
-        else:
-            # Keep non-alphabetic characters as they are
-            result += char
-    return result
+    return atbash(text)
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        # Streaming mode: python atbash.py -i FILE [-o FILE] ('-' for stdin/stdout)
+        translate_main(sys.argv[1:], "Apply the Atbash cipher to a file or stdin in fixed-size chunks.", ATBASH_BYTE_TABLE)
+        sys.exit(0)
+
     print("--- Atbash Cipher Encrypter ---")
     message = input("Enter the message to encrypt: ")
     encrypted_message = atbash_cipher(message)
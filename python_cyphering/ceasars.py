@@ -1,3 +1,10 @@
+import os
+import sys
+
+# The Caesar engine is shared with the decrypter in python_decyphering
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python_decyphering'))
+from caesar_core import caesar_shift, stream_main
+
 def caesar_encrypt(plaintext, key):
     """
     Encrypts a message using the Caesar cipher with a given key.
@@ -9,25 +16,7 @@ def caesar_encrypt(plaintext, key):
     Returns:
         str: The encrypted ciphertext message.
     """
-    encrypted_message = ""
-    for char in plaintext:
-        if char.isalpha():  # Check if the character is an alphabet letter
-            # Determine the starting ASCII value based on case
-            start = ord('a') if char.islower() else ord('A')
-            
-            # Find the position of the character (0-25)
-            position = ord(char) - start
-            
-            # Apply the shift
-            shifted_position = (position + key) % 26
-            
-            # Convert back to a character and append
-            encrypted_message += chr(start + shifted_position)
-        else:
-            # If it's not a letter (e.g., space, punctuation), keep it as is
-            encrypted_message += char
-            
-    return encrypted_message
+    return caesar_shift(plaintext, key)
 
 def generate_all_shifts(plaintext):
     """
@@ -44,6 +33,11 @@ def generate_all_shifts(plaintext):
     print("------------------------------------------")
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        # Streaming mode: python ceasars.py --key N [-i FILE] [-o FILE]
+        stream_main(sys.argv[1:], "Encrypt a file or stdin with a Caesar shift in fixed-size chunks.")
+        sys.exit(0)
+
     print("--- Caesar Cipher Encrypter ---")
     
     # Get the message from the user
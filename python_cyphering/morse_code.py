@@ -1,48 +1,19 @@
-# Morse Code dictionary for encoding
-TEXT_TO_MORSE_DICT = {
-    'A': '.-', 'B': '-...', 'C': '-.-.', 'D': '-..', 'E': '.', 'F': '..-.',
-    'G': '--.', 'H': '....', 'I': '..', 'J': '.---', 'K': '-.-', 'L': '.-..',
-    'M': '--', 'N': '-.', 'O': '---', 'P': '.--.', 'Q': '--.-', 'R': '.-.',
-    'S': '...', 'T': '-', 'U': '..-', 'V': '...-', 'W': '.--', 'X': '-..-',
-    'Y': '-.--', 'Z': '--..', '0': '-----', '1': '.----', '2': '..---',
-    '3': '...--', '4': '....-', '5': '.....', '6': '-....', '7': '--...',
-    '8': '---..', '9': '----.', '.': '.-.-.-', ',': '--..--', '?': '..--..',
-    '/': '-..-.', '(': '-.--.', ')': '-.--.-', '-': '-....-', '&': '.-...',
-    '@': '.--.-.'
-}
-
-def text_to_morse(text):
-    """
-    Converts English text to Morse code.
+import os
+import sys
 
-    Args:
-        text (str): The English text to convert to Morse code.
+# The Morse engine is shared with the decoder in python_decyphering
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python_decyphering'))
+from morse_core import MORSE_CODE, stream_main, text_to_morse
 
-    Returns:
-        str: The Morse code representation with letters separated by spaces
-             and words separated by ' / '.
-    """
-    morse_message = ""
-    
-    # Split text into words
-    words = text.upper().split()
-    
-    for word in words:
-        morse_word = ""
-        for char in word:
-            if char in TEXT_TO_MORSE_DICT:
-                morse_word += TEXT_TO_MORSE_DICT[char] + " "
-            else:
-                # For characters not in the dictionary, add a placeholder
-                morse_word += "? "
-        
-        # Remove the trailing space and add the word to the message
-        morse_message += morse_word.strip() + " / "
-    
-    # Remove the final " / " and return
-    return morse_message.strip(" / ")
+# Morse Code dictionary for encoding
+TEXT_TO_MORSE_DICT = MORSE_CODE
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        # Streaming mode: python morse_code.py -i FILE [-o FILE], one line at a time
+        stream_main(sys.argv[1:], "Encode a file or stdin as Morse code, line by line.")
+        sys.exit(0)
+
     print("--- Text to Morse Code Converter ---")
     print("Supported characters: A-Z, 0-9, . , ? / ( ) - & @")
     
@@ -1,72 +1,53 @@
+import os
+import sys
+
+# The Polybius engine is shared with the decrypter in python_decyphering
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python_decyphering'))
+from polybius_core import ALPHABETS, cli_main, format_square, keyed_alphabet, polybius_encode
+
 def create_polybius_square():
     """Creates the standard 5x5 Polybius Square for encoding."""
-    square = {}
-    alphabet = "ABCDEFGHIKLMNOPQRSTUVWXYZ"  # I/J are combined
-    k = 0
-    for i in range(1, 6):
-        for j in range(1, 6):
-            # Map each letter to its coordinate pair (e.g., A -> "11")
-            square[alphabet[k]] = f"{i}{j}"
-            k += 1
-    return square
+    alphabet = ALPHABETS[5]  # I/J are combined
+    # Map each letter to its coordinate pair (e.g., A -> "11")
+    return {char: f"{k // 5 + 1}{k % 5 + 1}" for k, char in enumerate(alphabet)}
 
-def polybius_encrypt(plaintext):
+def polybius_encrypt(plaintext, keyword=''):
     """
     Encrypts a message using the Polybius Square cipher.
 
     Args:
         plaintext (str): The message to encrypt.
+        keyword (str): Keyword of a mixed square (empty for the standard one).
 
     Returns:
         str: The encrypted message (a string of coordinate pairs).
     """
-    square = create_polybius_square()
-    encrypted_message = ""
-    
-    for char in plaintext.upper():
-        if char.isalpha():
-            # Handle the I/J combination
-            if char == 'J':
-                char = 'I'
-            
-            if char in square:
-                encrypted_message += square[char] + " "
-            else:
-                # This shouldn't happen with our alphabet
-                encrypted_message += "?? "
-        elif char == ' ':
-            # Optionally separate words with a special marker
-            encrypted_message += "/ "
-        else:
-            # Skip non-alphabetic characters or handle them differently
-            continue
-            
-    return encrypted_message.strip()
+    # J shares I's cell, spaces become '/' and other characters are skipped
+    return polybius_encode(plaintext, keyed_alphabet(keyword))
 
-def display_polybius_square():
+def display_polybius_square(keyword=''):
     """Displays the Polybius Square for reference."""
-    alphabet = "ABCDEFGHIKLMNOPQRSTUVWXYZ"
     print("\nPolybius Square Reference:")
-    print("   1  2  3  4  5")
-    k = 0
-    for i in range(1, 6):
-        row = f"{i} "
-        for j in range(1, 6):
-            row += f" {alphabet[k]} "
-            k += 1
-        print(row)
-    print("\nNote: I and J share the same position (24)")
+    print(format_square(keyed_alphabet(keyword)))
+    print("\nNote: I and J share the same position")
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        # python polybus_square.py [-k KEYWORD] [--size 6] [-i FILE] [-o FILE]
+        cli_main(sys.argv[1:], "Encrypt text into Polybius coordinate pairs.")
+        sys.exit(0)
+
     print("--- Polybius Square Encrypter ---")
     print("This cipher converts each letter to coordinate pairs (1-5, 1-5)")
     
+    keyword = input("Enter a keyword to mix the square (leave blank for the standard square): ")
+    
     # Show the square for reference
-    display_polybius_square()
+    display_polybius_square(keyword)
     
     message = input("\nEnter the message to encrypt: ")
     
-    encrypted_message = polybius_encrypt(message)
+    encrypted_message = polybius_encrypt(message, keyword)
     
     print("\nEncrypted message:")
     print(encrypted_message)
@@ -1,3 +1,10 @@
+import os
+import sys
+
+# The Vigenère engine is shared with the decrypter in python_decyphering
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python_decyphering'))
+from vigenere_core import stream_main, vigenere_text
+
 def vigenere_encrypt(plaintext, key):
     """
     Encrypts a message using the Vigenère cipher with a given key.
@@ -9,29 +16,7 @@ def vigenere_encrypt(plaintext, key):
     Returns:
         str: The encrypted ciphertext.
     """
-    encrypted_text = ""
-    key_index = 0
-    key = key.upper()
-    
-    for char in plaintext:
-        if char.isalpha():
-            # Get the shift value from the key (A=0, B=1, ...)
-            shift = ord(key[key_index % len(key)]) - ord('A')
-            
-            # Determine the base (A or a)
-            start = ord('A') if char.isupper() else ord('a')
-            
-            # Encrypt the character
-            encrypted_char_code = (ord(char) - start + shift) % 26
-            encrypted_text += chr(start + encrypted_char_code)
-            
-            # Move to the next letter in the key
-            key_index += 1
-        else:
-            # Keep non-alphabetic characters
-            encrypted_text += char
-            
-    return encrypted_text
+    return vigenere_text(plaintext, key)
 
 def generate_random_key(length):
     """
@@ -64,6 +49,11 @@ def display_vigenere_table():
     print("...")
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        # Streaming mode: python vinegere.py --key KEY [-i FILE] [-o FILE]
+        stream_main(sys.argv[1:], "Encrypt a file or stdin with the Vigenère cipher in fixed-size chunks.")
+        sys.exit(0)
+
     print("--- Vigenère Cipher Encrypter ---")
     print("The Vigenère cipher uses a repeating keyword to encrypt text.")
     
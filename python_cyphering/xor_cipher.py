@@ -1,25 +1,13 @@
+import argparse
 import binascii
-import random
+import os
+import secrets
 import string
+import sys
 
-def repeating_key_xor(plaintext_bytes, key_bytes):
-    """
-    Applies a repeating key XOR to a byte string.
-    
-    Args:
-        plaintext_bytes (bytes): The raw bytes of the message to encrypt.
-        key_bytes (bytes): The raw bytes of the key.
-        
-    Returns:
-        bytes: The resulting encrypted bytes after XORing.
-    """
-    if not key_bytes:
-        return plaintext_bytes
-        
-    encrypted_bytes = bytearray()
-    for i in range(len(plaintext_bytes)):
-        encrypted_bytes.append(plaintext_bytes[i] ^ key_bytes[i % len(key_bytes)])
-    return bytes(encrypted_bytes)
+# The XOR core is shared with the decrypters in python_decyphering
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python_decyphering'))
+from xor_core import DEFAULT_CHUNK_SIZE, repeating_key_xor, stream_main, xor_bytes
 
 def single_byte_xor_encrypt(plaintext_bytes, key_byte):
     """
@@ -32,14 +20,11 @@ def single_byte_xor_encrypt(plaintext_bytes, key_byte):
     Returns:
         bytes: The encrypted bytes.
     """
-    encrypted_bytes = bytearray()
-    for byte in plaintext_bytes:
-        encrypted_bytes.append(byte ^ key_byte)
-    return bytes(encrypted_bytes)
+    return repeating_key_xor(plaintext_bytes, bytes([key_byte]))
 
 def generate_random_key(length):
     """
-    Generates a random key of specified length.
+    Generates a cryptographically secure random key of specified length.
     
     Args:
         length (int): The length of the key in bytes.
@@ -47,7 +32,7 @@ def generate_random_key(length):
     Returns:
         bytes: A random key.
     """
-    return bytes([random.randint(0, 255) for _ in range(length)])
+    return secrets.token_bytes(length)
 
 def generate_random_string_key(length):
     """
@@ -59,7 +44,106 @@ def generate_random_string_key(length):
     Returns:
         str: A random string key.
     """
-    return ''.join(random.choices(string.ascii_letters + string.digits, k=length))
+    alphabet = string.ascii_letters + string.digits
+    return ''.join(secrets.choice(alphabet) for _ in range(length))
+
+def parse_size(text):
+    """
+    Parses a byte count with an optional K, M or G suffix (powers of 1024).
+    
+    Args:
+        text (str): e.g. "4096", "64K", "10M", "2G".
+        
+    Returns:
+        int: The size in bytes.
+    """
+    text = text.strip().upper()
+    multiplier = 1
+    if text and text[-1] in "KMG":
+        multiplier = 1024 ** ("KMG".index(text[-1]) + 1)
+        text = text[:-1]
+    size = int(text) * multiplier
+    if size < 0:
+        raise ValueError("Size cannot be negative.")
+    return size
+
+def write_random_pad(pad_path, size, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Streams a one-time pad of os.urandom bytes to a file in fixed-size chunks,
+    so pads larger than memory can be generated.
+    
+    Args:
+        pad_path (str): Where to write the pad.
+        size (int): The pad size in bytes.
+        chunk_size (int): Bytes generated and written per step.
+        
+    Returns:
+        int: The number of bytes written.
+    """
+    with open(pad_path, 'wb') as f:
+        remaining = size
+        while remaining > 0:
+            step = min(chunk_size, remaining)
+            f.write(os.urandom(step))
+            remaining -= step
+    return size
+
+def encrypt_file_with_pad(input_path, pad_path, output_path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    XORs a file with a one-time pad in one streaming pass.
+    The same call decrypts, since XOR is its own inverse.
+    
+    Args:
+        input_path (str): The file to encrypt or decrypt.
+        pad_path (str): The pad file; it must be at least as long as the input.
+        output_path (str): Where to write the result.
+        chunk_size (int): Bytes processed per step.
+        
+    Returns:
+        int: The number of bytes processed.
+    """
+    if os.path.getsize(pad_path) < os.path.getsize(input_path):
+        raise ValueError("Pad is shorter than the input; a one-time pad must never be reused or repeated.")
+    total = 0
+    with open(input_path, 'rb') as data_file, open(pad_path, 'rb') as pad_file, \
+            open(output_path, 'wb') as out_file:
+        while True:
+            chunk = data_file.read(chunk_size)
+            if not chunk:
+                break
+            out_file.write(xor_bytes(chunk, pad_file.read(len(chunk))))
+            total += len(chunk)
+    return total
+
+def pad_main(argv):
+    """
+    Command-line entry point for the one-time pad commands:
+        python xor_cipher.py pad OUTPUT SIZE
+        python xor_cipher.py otp INPUT PAD OUTPUT
+    """
+    parser = argparse.ArgumentParser(description="Generate one-time pads and encrypt files against them.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    pad_parser = subparsers.add_parser('pad', help="Write a random pad of SIZE bytes (K/M/G suffixes allowed)")
+    pad_parser.add_argument('output', help="Pad file to create")
+    pad_parser.add_argument('size', help="Pad size, e.g. 4096, 64K, 10M")
+    otp_parser = subparsers.add_parser('otp', help="XOR INPUT with PAD into OUTPUT (encrypts and decrypts)")
+    otp_parser.add_argument('input', help="File to encrypt or decrypt")
+    otp_parser.add_argument('pad', help="Pad file, at least as long as INPUT")
+    otp_parser.add_argument('output', help="Result file")
+    for sub in (pad_parser, otp_parser):
+        sub.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                         help=f"Bytes per chunk (default {DEFAULT_CHUNK_SIZE})")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == 'pad':
+            total = write_random_pad(args.output, parse_size(args.size), args.chunk_size)
+            print(f"Wrote {total} random bytes to {args.output}.", file=sys.stderr)
+        else:
+            total = encrypt_file_with_pad(args.input, args.pad, args.output, args.chunk_size)
+            print(f"Processed {total} bytes.", file=sys.stderr)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
 
 def xor_with_key(input_string, key):
     """
@@ -87,10 +171,18 @@ def xor_hex_strings(hex1, hex2):
     """
     bytes1 = bytes.fromhex(hex1)
     bytes2 = bytes.fromhex(hex2)
-    result = bytes(a ^ b for a, b in zip(bytes1, bytes2))
-    return result.hex()
+    return xor_bytes(bytes1, bytes2).hex()
 
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] in ('pad', 'otp'):
+        # One-time pad mode: python xor_cipher.py pad OUT SIZE | otp IN PAD OUT
+        pad_main(sys.argv[1:])
+        return
+    if len(sys.argv) > 1:
+        # Streaming mode: python xor_cipher.py --key KEY [-i FILE] [-o FILE] [--hex-in] [--hex-out]
+        stream_main(sys.argv[1:], "Encrypt a file or stdin with a repeating XOR key in fixed-size chunks.")
+        return
+
     print("=" * 50)
     print("--- XOR Encrypter ---")
     print("=" * 50)
@@ -115,7 +207,7 @@ def main():
         try:
             key_input = input("Enter key (0-255 or leave empty for random): ").strip()
             if key_input == "":
-                key_byte = random.randint(1, 255)
+                key_byte = secrets.randbelow(255) + 1
                 print(f"Generated random key: {key_byte}")
             else:
                 key_byte = int(key_input)
@@ -47,6 +47,20 @@ def build_decryption_map(cipher_freq_order):
         
     return decryption_map
 
+def build_translation_table(decryption_map):
+    """
+    Turns a decryption map into a str.translate table for both cases.
+    
+    Args:
+        decryption_map (dict): The mapping of cipher chars to plain chars.
+        
+    Returns:
+        dict: A translation table for str.translate.
+    """
+    cipher_chars = "".join(decryption_map)
+    plain_chars = "".join(decryption_map.values())
+    return str.maketrans(cipher_chars + cipher_chars.lower(), plain_chars + plain_chars.lower())
+
 def decrypt_with_map(ciphertext, decryption_map):
     """
     Decrypts a message using a provided character map.
@@ -58,19 +72,45 @@ def decrypt_with_map(ciphertext, decryption_map):
     Returns:
         str: The partially or fully decrypted message.
     """
-    decrypted_text = ""
-    for char in ciphertext:
-        upper_char = char.upper()
+    # Characters not in the map (e.g., punctuation) are kept as they are
+    return ciphertext.translate(build_translation_table(decryption_map))
+
+def index_letter_positions(ciphertext):
+    """
+    Records where each cipher letter occurs, so a changed mapping only
+    rewrites those positions.
+    
+    Args:
+        ciphertext (str): The encrypted message.
         
-        if upper_char in decryption_map:
-            decrypted_char = decryption_map[upper_char]
+    Returns:
+        dict: Uppercase cipher letter -> list of positions in the ciphertext.
+    """
+    positions = {}
+    for i, char in enumerate(ciphertext):
+        if char.isalpha():
+            positions.setdefault(char.upper(), []).append(i)
+    return positions
+
+def update_decryption(plain_chars, ciphertext, positions, decryption_map, changed_letters):
+    """
+    Rewrites the decryption in place for cipher letters whose mapping changed.
+    
+    Args:
+        plain_chars (list): The current decryption, one character per entry.
+        ciphertext (str): The encrypted message.
+        positions (dict): Output of index_letter_positions.
+        decryption_map (dict): The mapping of cipher chars to plain chars.
+        changed_letters (iterable): Uppercase cipher letters to rewrite.
+    """
+    for cipher_char in changed_letters:
+        plain_char = decryption_map.get(cipher_char)
+        if plain_char is None:
+            continue
+        lower_char = plain_char.lower()
+        for i in positions.get(cipher_char, ()):
             # Preserve original case
-            decrypted_text += decrypted_char if char.isupper() else decrypted_char.lower()
-        else:
-            # If a character is not in our map (e.g., punctuation), keep it
-            decrypted_text += char
-            
-    return decrypted_text
+            plain_chars[i] = plain_char if ciphertext[i].isupper() else lower_char
 
 if __name__ == "__main__":
     print("--- Simple Substitution Cipher Decrypter (Frequency Analysis) ---")
@@ -84,8 +124,14 @@ if __name__ == "__main__":
     print(f"\nCiphertext frequency order: {cipher_order}")
     print(f"Standard English order:   {ENGLISH_FREQ_ORDER}")
     
-    # 2. Build the initial decryption map
-    initial_map = build_decryption_map(cipher_order)
+    # 2. Build the initial decryption map, by quadgram hill climbing if asked
+    auto = input("\nSolve automatically with quadgram hill climbing? (yes/no): ").lower()
+    if auto in ['yes', 'y']:
+        from substitution_solver import solve_substitution
+        score, initial_map = solve_substitution(encrypted_message)
+        print(f"Best key scores {score:.3f} per quadgram.")
+    else:
+        initial_map = build_decryption_map(cipher_order)
     
     # 3. Perform the initial decryption
     decrypted_attempt = decrypt_with_map(encrypted_message, initial_map)
@@ -93,6 +139,10 @@ if __name__ == "__main__":
     print("\nInitial decryption attempt:")
     print(decrypted_attempt)
     
+    # Refinements only rewrite the positions of the letters they touch
+    letter_positions = index_letter_positions(encrypted_message)
+    plain_chars = list(decrypted_attempt)
+    
     # 4. Allow the user to refine the map
     while True:
         print("\n----------------------------------------------------")
@@ -118,14 +168,16 @@ if __name__ == "__main__":
                         original_mapping = initial_map[cipher_char]
                         initial_map[cipher_char] = plain_char
                         initial_map[current_key_for_plain_char] = original_mapping
+                        changed_letters = (cipher_char, current_key_for_plain_char)
                         print(f"Swapped: {cipher_char} now maps to {plain_char}, and {current_key_for_plain_char} now maps to {original_mapping}.")
                     else: # If the plain_char wasn't in the map, just assign it
                         initial_map[cipher_char] = plain_char
+                        changed_letters = (cipher_char,)
                         print(f"Set mapping: {cipher_char} now maps to {plain_char}.")
 
-                    decrypted_attempt = decrypt_with_map(encrypted_message, initial_map)
+                    update_decryption(plain_chars, encrypted_message, letter_positions, initial_map, changed_letters)
                     print("\nUpdated decryption attempt:")
-                    print(decrypted_attempt)
+                    print("".join(plain_chars))
                 else:
                     print("Invalid format. Both characters must be letters.")
             except ValueError:
@@ -0,0 +1,407 @@
+"""
+Shared Caesar/ROT engine used by the Caesar, ROT13 and Atbash tools.
+
+Each of the 26 shifts, and the Atbash mirror, is precomputed once as a
+str.translate table (and a bytes.translate table for streaming), so
+transforming a text is a single C-level pass instead of building the result
+one character at a time.
+
+The automatic solver weighs every key by the likelihood of the decrypted
+letter sequence under English letter-to-letter transitions, taken from the
+bigram table in ngram_data/ (read with the standard library, so the Caesar
+tools need no NumPy).
+"""
+
+import argparse
+import io
+import math
+import os
+import string
+import sys
+from array import array
+from collections import Counter
+from functools import lru_cache
+
+from xor_core import DEFAULT_CHUNK_SIZE, add_stream_arguments, open_streams
+
+LOWER = string.ascii_lowercase
+UPPER = string.ascii_uppercase
+
+# English letter frequencies (%) for A-Z
+ENGLISH_FREQUENCIES = [
+    8.167, 1.492, 2.782, 4.253, 12.702, 2.228, 2.015, 6.094, 6.966, 0.153, 0.772, 4.025, 2.406,
+    6.749, 7.507, 1.929, 0.095, 5.987, 6.327, 9.056, 2.758, 0.978, 2.360, 0.150, 1.974, 0.074,
+]
+LOG_FREQUENCIES = [math.log(frequency / 100) for frequency in ENGLISH_FREQUENCIES]
+
+# Letter bigram table shared with ngram_scorer: 26 * 26 little-endian int16
+# log10 probabilities scaled by BIGRAM_SCALE
+BIGRAM_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ngram_data', 'english_2grams.bin')
+BIGRAM_SCALE = 1000
+
+
+def _rotate(alphabet, shift):
+    return alphabet[shift:] + alphabet[:shift]
+
+
+# SHIFT_TABLES[k] shifts every ASCII letter forward by k, keeping its case
+SHIFT_TABLES = tuple(str.maketrans(LOWER + UPPER, _rotate(LOWER, k) + _rotate(UPPER, k))
+                     for k in range(26))
+BYTE_SHIFT_TABLES = tuple(bytes.maketrans((LOWER + UPPER).encode(),
+                                          (_rotate(LOWER, k) + _rotate(UPPER, k)).encode())
+                          for k in range(26))
+
+# Deletes everything but lowercase letters, then maps a-z to 0-25
+NON_LETTER_BYTES = bytes(b for b in range(256) if b not in LOWER.encode())
+LETTER_INDEX_TABLE = bytes.maketrans(LOWER.encode(), bytes(range(26)))
+
+# Atbash maps every ASCII letter to its mirror in the alphabet, keeping its case
+ATBASH_TABLE = str.maketrans(LOWER + UPPER, LOWER[::-1] + UPPER[::-1])
+ATBASH_BYTE_TABLE = bytes.maketrans((LOWER + UPPER).encode(), (LOWER[::-1] + UPPER[::-1]).encode())
+
+
+def caesar_shift(text, shift):
+    """
+    Shifts every ASCII letter of a text by `shift` positions.
+    Anything else (digits, punctuation, non-ASCII) is kept as is.
+
+    Args:
+        text (str or bytes): The text to shift.
+        shift (int): The shift; negative values decrypt.
+
+    Returns:
+        str or bytes: The shifted text, of the same type as `text`.
+    """
+    tables = BYTE_SHIFT_TABLES if isinstance(text, (bytes, bytearray)) else SHIFT_TABLES
+    return text.translate(tables[shift % 26])
+
+
+def atbash(text):
+    """
+    Applies the Atbash cipher (A<->Z, B<->Y, ...); it is its own inverse.
+
+    Args:
+        text (str or bytes): The text to transform.
+
+    Returns:
+        str or bytes: The transformed text, of the same type as `text`.
+    """
+    table = ATBASH_BYTE_TABLE if isinstance(text, (bytes, bytearray)) else ATBASH_TABLE
+    return text.translate(table)
+
+
+def letter_histogram(text):
+    """
+    Counts each letter, ignoring case and everything that is not A-Z.
+
+    Args:
+        text (str or bytes): The text to count.
+
+    Returns:
+        list: 26 counts for A-Z.
+    """
+    if isinstance(text, (bytes, bytearray)):
+        counts = Counter(bytes(text).lower())
+        return [counts[b] for b in LOWER.encode()]
+    counts = Counter(text.lower())
+    return [counts[c] for c in LOWER]
+
+
+def chi_squared(histogram):
+    """
+    Chi-squared distance between a letter histogram and English.
+    Lower means more English-like.
+
+    Args:
+        histogram (list): 26 letter counts.
+
+    Returns:
+        float: The chi-squared statistic (inf for a text without letters).
+    """
+    total = sum(histogram)
+    if total == 0:
+        return float('inf')
+    score = 0.0
+    for observed, frequency in zip(histogram, ENGLISH_FREQUENCIES):
+        expected = total * frequency / 100
+        score += (observed - expected) ** 2 / expected
+    return score
+
+
+def shift_chi_squared(histogram):
+    """
+    Chi-squared against English for all 26 keys from one ciphertext histogram.
+
+    Decrypting with key k turns ciphertext letter (i + k) into plaintext
+    letter i, so the plaintext histogram for key k is the ciphertext
+    histogram rotated by k. No candidate is ever decrypted: O(26^2).
+
+    Args:
+        histogram (list): 26 letter counts of the ciphertext.
+
+    Returns:
+        list: 26 chi-squared scores, indexed by key.
+    """
+    total = sum(histogram)
+    if total == 0:
+        return [float('inf')] * 26
+    expected = [total * frequency / 100 for frequency in ENGLISH_FREQUENCIES]
+    return [sum((histogram[(i + key) % 26] - expected[i]) ** 2 / expected[i] for i in range(26))
+            for key in range(26)]
+
+
+@lru_cache(maxsize=None)
+def transition_log_probs():
+    """
+    Loads the English letter transitions once per process.
+
+    Returns:
+        tuple: (transitions, initial) where transitions[a * 26 + b] is the
+            natural log of P(next letter b | letter a) and initial[a] the
+            natural log of P(a), both normalised from the bigram table.
+    """
+    table = array('h')
+    with open(BIGRAM_PATH, 'rb') as f:
+        table.fromfile(f, 26 * 26)
+    if sys.byteorder == 'big':
+        table.byteswap()
+    probabilities = [10 ** (value / BIGRAM_SCALE) for value in table]
+    rows = [sum(probabilities[a * 26:a * 26 + 26]) for a in range(26)]
+    total = sum(rows)
+    transitions = [math.log(probabilities[i] / rows[i // 26]) for i in range(26 * 26)]
+    initial = [math.log(row / total) for row in rows]
+    return transitions, initial
+
+
+def letter_indices(text):
+    """
+    Keeps only the letters of a text, as indices 0-25, ignoring case.
+
+    Args:
+        text (str or bytes): The text.
+
+    Returns:
+        bytes: One byte (0-25) per letter.
+    """
+    if isinstance(text, str):
+        text = text.encode('latin-1', errors='ignore')
+    return bytes(text).lower().translate(LETTER_INDEX_TABLE, NON_LETTER_BYTES)
+
+
+def letter_pairs(letters):
+    """
+    Counts consecutive letter pairs; pairs span spaces and punctuation.
+
+    Args:
+        letters (bytes): Letter indices from letter_indices.
+
+    Returns:
+        Counter: (first, second) letter index pairs -> count.
+    """
+    return Counter(zip(letters, letters[1:]))
+
+
+def key_posteriors(pairs, first=None):
+    """
+    Probability of each key, given the letter pairs of the ciphertext.
+
+    Each key is weighed by the likelihood of its decryption as a chain of
+    English letter transitions, normalised over all 26 keys: the best key
+    gets close to 1 when it clearly wins, and every key gets close to 1/26
+    when the text is too short to tell. Unlike letter counts, transitions
+    tell 'the' from its rotations even in a few words.
+
+    Args:
+        pairs (Counter): Letter pair counts of the ciphertext (letter_pairs).
+        first (int): Index of the first ciphertext letter, or None.
+
+    Returns:
+        list: 26 probabilities, indexed by key.
+    """
+    transitions, initial = transition_log_probs()
+    log_likelihoods = []
+    for k in range(26):
+        value = initial[(first - k) % 26] if first is not None else 0.0
+        for (a, b), count in pairs.items():
+            value += count * transitions[(a - k) % 26 * 26 + (b - k) % 26]
+        log_likelihoods.append(value)
+    best = max(log_likelihoods)
+    weights = [math.exp(value - best) for value in log_likelihoods]
+    total = sum(weights)
+    return [weight / total for weight in weights]
+
+
+def most_likely_key(pairs, first=None):
+    """
+    Picks the key with the highest posterior, so the key and its confidence
+    come from the same measure.
+
+    Args:
+        pairs (Counter): Letter pair counts of the ciphertext (letter_pairs).
+        first (int): Index of the first ciphertext letter, or None.
+
+    Returns:
+        tuple: (key, confidence)
+    """
+    posteriors = key_posteriors(pairs, first)
+    key = max(range(26), key=posteriors.__getitem__)
+    return key, posteriors[key]
+
+
+def solve(ciphertext):
+    """
+    Finds the Caesar key automatically from the letter pairs of the text.
+
+    On short texts the most likely key can differ from the one with the
+    lowest chi-squared, which only looks at letter counts:
+
+    >>> min(range(26), key=shift_chi_squared(letter_histogram('Uryyb')).__getitem__)
+    24
+    >>> solve('Uryyb')[::2]
+    (13, 'Hello')
+    >>> solve('Wkh txlfn eurzq ira')[::2]
+    (3, 'The quick brown fox')
+
+    Args:
+        ciphertext (str or bytes): The encrypted text.
+
+    Returns:
+        tuple: (key, confidence, plaintext)
+    """
+    letters = letter_indices(ciphertext)
+    key, confidence = most_likely_key(letter_pairs(letters), letters[0] if letters else None)
+    return key, confidence, caesar_shift(ciphertext, -key)
+
+
+def brute_force(ciphertext):
+    """
+    Decrypts a text with all 26 keys and ranks the candidates.
+
+    Args:
+        ciphertext (str or bytes): The encrypted text.
+
+    Returns:
+        list: 26 tuples (chi_squared, key, plaintext), most English-like first.
+    """
+    scores = shift_chi_squared(letter_histogram(ciphertext))
+    return [(scores[key], key, caesar_shift(ciphertext, -key))
+            for key in sorted(range(26), key=scores.__getitem__)]
+
+
+def translate_stream(in_stream, out_stream, table, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Runs a whole binary stream through a bytes.translate table in fixed-size
+    chunks using constant memory. The table does not depend on position, so
+    chunks need no carry-over.
+
+    Args:
+        in_stream: Binary file object to read from.
+        out_stream: Binary file object to write to.
+        table (bytes): A 256-byte translation table.
+        chunk_size (int): Number of bytes processed per step.
+
+    Returns:
+        int: The number of bytes processed.
+    """
+    total = 0
+    while True:
+        chunk = in_stream.read(chunk_size)
+        if not chunk:
+            return total
+        out_stream.write(chunk.translate(table))
+        total += len(chunk)
+
+
+def shift_stream(in_stream, out_stream, shift, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Shifts a whole binary stream in fixed-size chunks using constant memory.
+
+    Args:
+        in_stream: Binary file object to read from.
+        out_stream: Binary file object to write to.
+        shift (int): The shift; negative values decrypt.
+        chunk_size (int): Number of bytes processed per step.
+
+    Returns:
+        int: The number of bytes processed.
+    """
+    return translate_stream(in_stream, out_stream, BYTE_SHIFT_TABLES[shift % 26], chunk_size)
+
+
+def translate_main(argv, description, table):
+    """
+    Command-line entry point for the fixed-table tools (ROT13, Atbash), which
+    need no key and are their own inverse.
+
+    Args:
+        argv (list): Command-line arguments (without the program name).
+        description (str): Help text shown by --help.
+        table (bytes): The bytes.translate table to apply.
+    """
+    parser = argparse.ArgumentParser(description=description)
+    add_stream_arguments(parser)
+    args = parser.parse_args(argv)
+
+    with open_streams(args.input, args.output) as (in_stream, out_stream):
+        total = translate_stream(in_stream, out_stream, table, args.chunk_size)
+    print(f"Processed {total} bytes.", file=sys.stderr)
+
+
+def stream_main(argv, description, decrypt=False):
+    """
+    Command-line entry point for the streaming mode of the Caesar tools.
+
+    Args:
+        argv (list): Command-line arguments (without the program name).
+        description (str): Help text shown by --help.
+        decrypt (bool): Shift backwards by the key instead of forwards.
+    """
+    parser = argparse.ArgumentParser(description=description)
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument('-k', '--key', type=int, help="The shift (0-25)")
+    mode.add_argument('--brute', action='store_true',
+                      help="Print all 26 shifts of the input, ranked by chi-squared against English")
+    if decrypt:
+        mode.add_argument('--auto', action='store_true',
+                          help="Find the key automatically and write the decrypted input")
+        parser.add_argument('--per-line', action='store_true',
+                            help="With --auto, solve every line on its own and write 'key<TAB>confidence<TAB>text'")
+    add_stream_arguments(parser)
+    args = parser.parse_args(argv)
+    if decrypt and args.per_line and not args.auto:
+        parser.error("--per-line only works with --auto.")
+
+    with open_streams(args.input, args.output) as (in_stream, out_stream):
+        if args.brute:
+            for score, key, shifted in brute_force(in_stream.read()):
+                # Shifting back by k is the same as encrypting with 26 - k
+                shown_key = key if decrypt else (26 - key) % 26
+                out_stream.write(f"Key #{shown_key:02d} (chi2={score:.1f}): ".encode() + shifted + b'\n')
+            return
+        if decrypt and args.auto and args.per_line:
+            total = 0
+            for line in in_stream:
+                key, confidence, plaintext = solve(line.rstrip(b'\r\n'))
+                out_stream.write(f"{key}\t{confidence:.3f}\t".encode() + plaintext + b'\n')
+                total += len(line)
+        elif decrypt and args.auto:
+            if not in_stream.seekable():
+                in_stream = io.BytesIO(in_stream.read())
+            # First pass counts letter pairs, second pass decrypts; the last
+            # letter of a chunk pairs with the first letter of the next one
+            pairs = Counter()
+            letters = b''
+            first = None
+            for chunk in iter(lambda: in_stream.read(args.chunk_size), b''):
+                letters = letters[-1:] + letter_indices(chunk)
+                if first is None and letters:
+                    first = letters[0]
+                pairs.update(letter_pairs(letters))
+            key, confidence = most_likely_key(pairs, first)
+            print(f"Key: {key} (confidence {confidence:.3f})", file=sys.stderr)
+            in_stream.seek(0)
+            total = shift_stream(in_stream, out_stream, -key, args.chunk_size)
+        else:
+            shift = -args.key if decrypt else args.key
+            total = shift_stream(in_stream, out_stream, shift, args.chunk_size)
+    print(f"Processed {total} bytes.", file=sys.stderr)
@@ -1,3 +1,7 @@
+import sys
+
+from caesar_core import brute_force, caesar_shift, solve, stream_main
+
 def caesar_decrypt(ciphertext, key):
     """
     Decrypts a message using the Caesar cipher with a given key.
@@ -9,25 +13,7 @@ def caesar_decrypt(ciphertext, key):
     Returns:
         str: The decrypted plaintext message.
     """
-    decrypted_message = ""
-    for char in ciphertext:
-        if char.isalpha():  # Check if the character is an alphabet letter
-            # Determine the starting ASCII value based on case
-            start = ord('a') if char.islower() else ord('A')
-            
-            # Find the position of the character (0-25)
-            position = ord(char) - start
-            
-            # Apply the reverse shift
-            shifted_position = (position - key) % 26
-            
-            # Convert back to a character and append
-            decrypted_message += chr(start + shifted_position)
-        else:
-            # If it's not a letter (e.g., space, punctuation), keep it as is
-            decrypted_message += char
-            
-    return decrypted_message
+    return caesar_shift(ciphertext, -key)
 
 def brute_force_decrypt(ciphertext):
     """
@@ -36,15 +22,20 @@ def brute_force_decrypt(ciphertext):
     Args:
         ciphertext (str): The encrypted message.
     """
-    print("\n--- Brute-Forcing All Possible Keys ---")
-    # There are 26 possible keys for the English alphabet
-    for key in range(1, 26):
-        decrypted_text = caesar_decrypt(ciphertext, key)
-        print(f"Key #{key:02d}: {decrypted_text}")
+    print("\n--- Brute-Forcing All Possible Keys (most English-like first) ---")
+    for score, key, decrypted_text in brute_force(ciphertext):
+        if key == 0:
+            continue
+        print(f"Key #{key:02d} (chi2={score:8.1f}): {decrypted_text}")
     print("--------------------------------------")
 
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        # Streaming mode: python ceasars.py --key N [-i FILE] [-o FILE], or --brute
+        stream_main(sys.argv[1:], "Decrypt a Caesar-shifted file or stdin in fixed-size chunks.", decrypt=True)
+        sys.exit(0)
+
     print("Caesar Cipher Decrypter")
     
     # Get the encrypted message from the user
@@ -67,8 +58,11 @@ if __name__ == "__main__":
                 print("Invalid input. Please enter a number for the key.")
                 
         elif choice in ['no', 'n']:
+            best_key, confidence, best_text = solve(encrypted_text)
+            print(f"\nMost likely key: {best_key} (confidence {confidence:.1%})")
+            print(f"Decrypted message: {best_text}")
             brute_force_decrypt(encrypted_text)
-            print("\nLook through the list above to find the message that makes sense.")
+            print("\nIf the guess is wrong, look through the list above to find the message that makes sense.")
             break
             
         else:
@@ -1,4 +1,6 @@
+import argparse
 import os
+import sys
 from PIL import Image
 import numpy as np
 
@@ -7,6 +9,9 @@ image1_path = 'flag.png'
 image2_path = 'lemur.png'
 output_path = 'xor_revealed.png'
 
+# Rows XORed per step in the tiled mode
+DEFAULT_BAND_ROWS = 256
+
 def xor_images(img1_path, img2_path, output_path):
     # Load images
     img1 = Image.open(img1_path).convert('RGB')
@@ -17,14 +22,156 @@ def xor_images(img1_path, img2_path, output_path):
         raise ValueError('Images must be the same size!')
     
     arr1 = np.array(img1)
-    arr2 = np.array(img2)
+    arr2 = np.asarray(img2)
     
-    # XOR the RGB values
-    xor_arr = np.bitwise_xor(arr1, arr2)
-    xor_img = Image.fromarray(xor_arr.astype('uint8'), 'RGB')
+    # XOR the RGB values in place, no third array or extra uint8 copy
+    np.bitwise_xor(arr1, arr2, out=arr1)
+    xor_img = Image.fromarray(arr1, 'RGB')
     xor_img.save(output_path)
     print(f'Revealed image saved to: {output_path}')
 
+def read_ppm_header(f):
+    """Parses a binary PPM (P6) header. Returns (header_bytes, width, height)."""
+    fields = []
+    header = f.read(2)
+    if header != b'P6':
+        raise ValueError('Not a binary PPM (P6) file.')
+    while len(fields) < 3:
+        byte = f.read(1)
+        if not byte:
+            raise ValueError('Truncated PPM header.')
+        header += byte
+        if byte == b'#':
+            # Skip comments up to the end of the line
+            line = f.readline()
+            header += line
+        elif not byte.isspace():
+            token = byte
+            while True:
+                byte = f.read(1)
+                header += byte
+                if not byte or byte.isspace():
+                    break
+                token += byte
+            fields.append(int(token))
+    width, height, maxval = fields
+    if maxval > 255:
+        raise ValueError('Only 8-bit PPM files are supported.')
+    return header, width, height
+
+def open_raster(path, raw_shape=None, mode='r'):
+    """
+    Memory-maps the pixel data of a PPM (P6), 24/32-bit uncompressed BMP or raw RGB file.
+
+    32-bit BMP pixels are stored as BGRA, so their rows hold an alpha byte
+    after every three colour bytes; callers must not XOR it (see
+    xor_images_tiled).
+
+    Args:
+        path (str): Image path.
+        raw_shape (tuple): (width, height) for headerless raw RGB files.
+        mode (str): numpy memmap mode.
+
+    Returns:
+        tuple: (header_bytes, pixel rows as a (rows, row_bytes) uint8 memmap,
+            bytes per pixel: 3, or 4 for 32-bit BMP)
+    """
+    with open(path, 'rb') as f:
+        if raw_shape is not None:
+            width, height = raw_shape
+            header, row_bytes, pixel_bytes = b'', width * 3, 3
+        elif path.lower().endswith('.bmp'):
+            header = f.read(54)
+            if header[:2] != b'BM':
+                raise ValueError(f'{path} is not a BMP file.')
+            data_offset = int.from_bytes(header[10:14], 'little')
+            width = int.from_bytes(header[18:22], 'little', signed=True)
+            height = abs(int.from_bytes(header[22:26], 'little', signed=True))
+            bits = int.from_bytes(header[28:30], 'little')
+            compression = int.from_bytes(header[30:34], 'little')
+            if bits not in (24, 32) or compression not in (0, 3):
+                raise ValueError('Only uncompressed 24/32-bit BMP files are supported.')
+            f.seek(0)
+            header = f.read(data_offset)
+            pixel_bytes = bits // 8
+            # BMP rows are padded to a multiple of 4 bytes
+            row_bytes = (width * pixel_bytes + 3) & ~3
+        else:
+            header, width, height = read_ppm_header(f)
+            row_bytes, pixel_bytes = width * 3, 3
+    pixels = np.memmap(path, dtype=np.uint8, mode=mode, offset=len(header), shape=(height, row_bytes))
+    return header, pixels, pixel_bytes
+
+def xor_images_tiled(img1_path, img2_path, output_path, band_rows=DEFAULT_BAND_ROWS, raw_shape=None, base=None):
+    """
+    XORs two PPM/BMP/raw images band by band into a preallocated output file.
+    Only band_rows rows of each image are touched at a time, so memory stays
+    bounded for multi-gigapixel images.
+
+    For 32-bit BMPs only the colour bytes carry the XOR: the alpha byte of
+    every output pixel is set to 0xFF, since XORing two opaque alphas would
+    give a fully transparent image.
+
+    Args:
+        base (tuple): Already opened (header, pixels, pixel_bytes) of img1, reused in batch mode.
+    """
+    header1, pixels1, pixel_bytes = base if base is not None else open_raster(img1_path, raw_shape)
+    _, pixels2, pixel_bytes2 = open_raster(img2_path, raw_shape)
+    if pixels1.shape != pixels2.shape or pixel_bytes != pixel_bytes2:
+        raise ValueError('Images must be the same size!')
+
+    # Preallocate the output: copy the header, then size the file for the pixel data
+    with open(output_path, 'wb') as f:
+        f.write(header1)
+        f.truncate(len(header1) + pixels1.size)
+    out = np.memmap(output_path, dtype=np.uint8, mode='r+', offset=len(header1), shape=pixels1.shape)
+
+    for start in range(0, pixels1.shape[0], band_rows):
+        stop = start + band_rows
+        band = out[start:stop]
+        np.bitwise_xor(pixels1[start:stop], pixels2[start:stop], out=band)
+        if pixel_bytes == 4:
+            # 32-bit rows need no padding, so each row is a run of BGRA pixels
+            band.reshape(len(band), -1, 4)[:, :, 3] = 0xFF
+    out.flush()
+    del out
+    print(f'Revealed image saved to: {output_path}')
+
+def xor_against_many(base_path, other_paths, output_dir, band_rows=DEFAULT_BAND_ROWS, raw_shape=None):
+    """
+    XORs one image against a list of others, writing one output per image.
+    The base image is memory-mapped once and reused for every pair.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    base = open_raster(base_path, raw_shape)
+    for other_path in other_paths:
+        name, ext = os.path.splitext(os.path.basename(other_path))
+        output_path = os.path.join(output_dir, f'xor_{name}{ext}')
+        xor_images_tiled(base_path, other_path, output_path, band_rows, raw_shape, base=base)
+
+def main(argv):
+    parser = argparse.ArgumentParser(
+        description='XOR images band by band (PPM P6, uncompressed BMP or raw RGB with --raw).')
+    parser.add_argument('base', help='Base image')
+    parser.add_argument('others', nargs='+', help='Image(s) to XOR with the base image')
+    parser.add_argument('-o', '--output', default='xor_revealed',
+                        help='Output file (one other image) or directory (several)')
+    parser.add_argument('--band-rows', type=int, default=DEFAULT_BAND_ROWS, help='Rows XORed per step')
+    parser.add_argument('--raw', metavar='WIDTHxHEIGHT', help='Inputs are headerless raw RGB of this size')
+    args = parser.parse_args(argv)
+
+    raw_shape = tuple(int(v) for v in args.raw.lower().split('x')) if args.raw else None
+    if len(args.others) == 1:
+        output = args.output
+        if output == 'xor_revealed':
+            output += os.path.splitext(args.others[0])[1]
+        xor_images_tiled(args.base, args.others[0], output, args.band_rows, raw_shape)
+    else:
+        xor_against_many(args.base, args.others, args.output, args.band_rows, raw_shape)
+
 if __name__ == '__main__':
-    # Place image1.png and image2.png in this folder before running
-    xor_images(image1_path, image2_path, output_path)
+    if len(sys.argv) > 1:
+        main(sys.argv[1:])
+    else:
+        # Place image1.png and image2.png in this folder before running
+        xor_images(image1_path, image2_path, output_path)
@@ -1,19 +1,23 @@
 from urllib.request import urlopen
-from itertools import cycle
 import json
+import os
+import sys
 
-url = 'https://aes.cryptohack.org/bean_counter/'
-png_header_hex = '89504e470d0a1a0a0000000d49484452'
-png_header = bytes.fromhex(png_header_hex)
-
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..'))
+from keystream_recovery import SAMPLE_SIZE, recover_keystream
+from xor_core import repeating_key_xor
 
-def xor(a, b):
-    return bytes([x ^ y for x, y in zip(a, b)])
+url = 'https://aes.cryptohack.org/bean_counter/'
 
 
 response = json.loads(urlopen(url + 'encrypt/').read())
 ciphertext = bytes.fromhex(response['encrypted'])
-key = xor(ciphertext, png_header)
-plaintext = xor(ciphertext, cycle(key))
+# The counter never advances, so the keystream repeats every 16 bytes and the
+# PNG header and IEND trailer give it away
+results = recover_keystream(ciphertext[:SAMPLE_SIZE], ciphertext[-SAMPLE_SIZE:], len(ciphertext), ['PNG'])
+if not results:
+    sys.exit("The ciphertext does not fit a PNG header, so the keystream cannot be recovered.")
+name, period, key, checks, unknown = results[0]
+plaintext = repeating_key_xor(ciphertext, key)
 
-open('bean_flag.png', 'wb').write(plaintext)
\ No newline at end of file
+open('bean_flag.png', 'wb').write(plaintext)
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Cipher-Type Identifier
+Guesses which classical cipher produced an unlabeled ciphertext and hands it
+straight to the matching solver in this directory.
+
+A cheap feature vector is taken from one character count of the sample:
+alphabet size, letter/digit/Morse shares, dot/dash ratio, entropy, index of
+coincidence and chi-squared fits of the Caesar and Atbash decryptions, plus
+the best periodic IoC for polyalphabetic ciphers. The features are turned
+into a ranking of cipher types, so a batch of thousands of samples only runs
+the one solver that fits each sample instead of every solver on every sample.
+"""
+
+import argparse
+import json
+import math
+import string
+import sys
+from collections import Counter
+from functools import partial
+from multiprocessing import Pool
+
+from caesar_core import chi_squared, shift_chi_squared, solve as solve_caesar_key
+from ngram_scorer import get_scorer, text_to_indices
+from vigenere_core import (ENGLISH_IOC, MIN_COLUMN_LETTERS, RANDOM_IOC, estimate_key_lengths,
+                           ioc_by_length, solve_key, vigenere_text)
+
+# Longest period tried for the periodic IoC
+MAX_PERIOD = 20
+
+# Chi-squared per letter at which a decryption stops looking like English
+CHI_PER_LETTER_LIMIT = 0.6
+
+# Floor and ceiling of the normalised IoC, so a short or pangram-like sample
+# still gets a ranking instead of zero everywhere
+IOC_SMOOTHING = 0.05
+
+MORSE_CHARS = '.-/_|'
+MORSE_DOT_DASH_RANGE = (0.2, 5.0)
+WHITESPACE = set(string.whitespace)
+
+# Samples sent to a batch worker per task
+BATCH_CHUNK_SAMPLES = 16
+
+# Ciphers that can be ranked, with the script that handles each one
+CIPHER_SCRIPTS = {
+    'caesar': 'ceasars.py',
+    'atbash': 'atbash.py',
+    'substitution': 'basic_substitution.py',
+    'vigenere': 'vinegere.py',
+    'polybius': 'polybus_square.py',
+    'morse': 'morse_code.py',
+    'homophonic': None,
+}
+
+
+def extract_features(text, max_period=MAX_PERIOD):
+    """
+    Computes the classification features of a sample.
+
+    Args:
+        text (str): The ciphertext.
+        max_period (int): Longest period tried for the periodic IoC.
+
+    Returns:
+        dict: Feature name -> value.
+    """
+    counts = Counter(text)
+    visible = sum(n for char, n in counts.items() if char not in WHITESPACE)
+    histogram = [counts[c] + counts[c.lower()] for c in string.ascii_uppercase]
+    letters = sum(histogram)
+    digits = [d for d in string.digits if counts[d]]
+    digit_count = sum(counts[d] for d in digits)
+    dots, dashes = counts['.'], counts['-']
+    morse = sum(counts[c] for c in MORSE_CHARS)
+
+    entropy = 0.0
+    for char, n in counts.items():
+        if char not in WHITESPACE:
+            entropy -= n / visible * math.log2(n / visible)
+
+    ioc = sum(n * (n - 1) for n in histogram) / (letters * (letters - 1)) if letters > 1 else 0.0
+    periodic_ioc, period = ioc, 1
+    longest = min(max_period, letters // MIN_COLUMN_LETTERS)
+    if longest >= 2:
+        by_length = ioc_by_length(text_to_indices(text), longest)
+        period = int(by_length[1:].argmax()) + 2
+        periodic_ioc = float(by_length[period - 1])
+
+    return {
+        'length': visible,
+        'alphabet_size': sum(1 for char in counts if char not in WHITESPACE),
+        'letter_share': letters / visible if visible else 0.0,
+        'distinct_letters': sum(1 for n in histogram if n),
+        'digit_share': digit_count / visible if visible else 0.0,
+        'digit_range': (int(digits[0]), int(digits[-1])) if digits else None,
+        'digit_count_even': digit_count % 2 == 0,
+        'morse_share': morse / visible if visible else 0.0,
+        'dot_dash_ratio': dots / dashes if dashes else float(dots),
+        'entropy': entropy,
+        'ioc': ioc,
+        'periodic_ioc': periodic_ioc,
+        'period': period,
+        'caesar_chi': min(shift_chi_squared(histogram)) / letters if letters else float('inf'),
+        'atbash_chi': chi_squared(histogram[::-1]) / letters if letters else float('inf'),
+    }
+
+
+def english_fit(chi_per_letter):
+    """Maps a chi-squared per letter to 0..1, close to 1 for English-like text."""
+    return 1 / (1 + (chi_per_letter / CHI_PER_LETTER_LIMIT) ** 4)
+
+
+def normalized_ioc(ioc):
+    """Maps an IoC to 0 for random letters and 1 for English, clipped to the smoothing bounds."""
+    return min(1 - IOC_SMOOTHING, max(IOC_SMOOTHING, (ioc - RANDOM_IOC) / (ENGLISH_IOC - RANDOM_IOC)))
+
+
+def rank_cipher_types(features):
+    """
+    Ranks the cipher types for a feature vector.
+
+    Args:
+        features (dict): Output of extract_features.
+
+    Returns:
+        list: (cipher type, probability) tuples, most likely first.
+    """
+    scores = dict.fromkeys(CIPHER_SCRIPTS, 0.0)
+
+    if features['morse_share'] > 0.9:
+        # English Morse has somewhat more dots than dashes
+        plausible = MORSE_DOT_DASH_RANGE[0] <= features['dot_dash_ratio'] <= MORSE_DOT_DASH_RANGE[1]
+        scores['morse'] = features['morse_share'] * (1.0 if plausible else IOC_SMOOTHING)
+
+    digit_range = features['digit_range']
+    if digit_range is not None and features['digit_share'] > 0.9:
+        low, high = digit_range
+        if low >= 1 and high <= 6 and features['digit_count_even']:
+            scores['polybius'] = features['digit_share']
+        else:
+            # Digit codes outside a Polybius square: numbered homophones
+            scores['homophonic'] = features['digit_share']
+
+    share = features['letter_share']
+    mono = normalized_ioc(features['ioc'])
+    caesar_fit = english_fit(features['caesar_chi'])
+    atbash_fit = english_fit(features['atbash_chi'])
+    scores['caesar'] = share * mono * caesar_fit
+    scores['atbash'] = share * mono * atbash_fit
+    scores['substitution'] = share * mono * (1 - max(caesar_fit, atbash_fit))
+    if features['period'] > 1:
+        scores['vigenere'] = share * (1 - mono) * normalized_ioc(features['periodic_ioc'])
+    if features['distinct_letters'] == 26 and mono < 0.3 and features['period'] == 1:
+        # Flat letters without a period: several symbols per plaintext letter
+        scores['homophonic'] = max(scores['homophonic'], share * (1 - mono))
+
+    total = sum(scores.values())
+    if total == 0:
+        return []
+    return sorted(((name, score / total) for name, score in scores.items() if score > 0),
+                  key=lambda item: item[1], reverse=True)
+
+
+def solve_caesar(text):
+    return solve_caesar_key(text)[2]
+
+
+def solve_atbash(text):
+    from atbash import atbash_cipher
+    return atbash_cipher(text)
+
+
+def solve_substitution(text):
+    from basic_substitution import decrypt_with_map
+    from substitution_solver import solve_substitution as find_map
+    # One process per sample; batches parallelise over samples instead
+    _, decryption_map = find_map(text, processes=1)
+    return decrypt_with_map(text, decryption_map)
+
+
+def solve_vigenere(text):
+    # Short samples can rank the key length wrongly, so the decryptions of the
+    # best few lengths are compared by their quadgrams
+    scorer = get_scorer(4)
+    best_score, best_text = float('-inf'), text
+    for length, _, _, _ in estimate_key_lengths(text, top=3):
+        key, _ = solve_key(text, length)
+        candidate = vigenere_text(text, key, decrypt=True)
+        score = scorer.score_normalized(candidate)
+        if score > best_score:
+            best_score, best_text = score, candidate
+    return best_text
+
+
+def solve_polybius(text):
+    from polybus_square import polybius_decrypt
+    return polybius_decrypt(text)
+
+
+def solve_morse(text):
+    from morse_code import morse_to_text
+    return morse_to_text(text)
+
+
+SOLVERS = {
+    'caesar': solve_caesar,
+    'atbash': solve_atbash,
+    'substitution': solve_substitution,
+    'vigenere': solve_vigenere,
+    'polybius': solve_polybius,
+    'morse': solve_morse,
+}
+
+
+def identify_and_solve(text, solve=True):
+    """
+    Ranks the cipher types of a sample and runs the solver of the best one.
+
+    Args:
+        text (str): The ciphertext.
+        solve (bool): Run the solver; otherwise only rank.
+
+    Returns:
+        dict: JSON-ready result with the features, the ranking and, when a
+            solver exists for the top type, the plaintext.
+    """
+    features = extract_features(text)
+    ranking = rank_cipher_types(features)
+    result = {'ranking': [[name, round(p, 3)] for name, p in ranking],
+              'features': {k: (round(v, 4) if isinstance(v, float) else v) for k, v in features.items()}}
+    if solve and ranking and ranking[0][0] in SOLVERS:
+        result['plaintext'] = SOLVERS[ranking[0][0]](text)
+    return result
+
+
+def classify_sample(sample, solve=True):
+    """
+    Batch worker: identifies (and solves) one named sample.
+
+    Args:
+        sample (tuple): (name, text).
+        solve (bool): Run the solver of the top type.
+
+    Returns:
+        dict: identify_and_solve result with the sample name first.
+    """
+    name, text = sample
+    result = {'sample': name}
+    result.update(identify_and_solve(text, solve))
+    return result
+
+
+def read_samples(paths, per_line=False):
+    """
+    Yields (name, text) samples from files, or from each non-blank line.
+    """
+    for path in paths:
+        in_stream = sys.stdin if path == '-' else open(path, encoding='utf-8', errors='replace')
+        try:
+            if per_line:
+                for line_no, line in enumerate(in_stream, 1):
+                    if line.strip():
+                        yield f'{path}:{line_no}', line.strip()
+            else:
+                yield path, in_stream.read()
+        finally:
+            if in_stream is not sys.stdin:
+                in_stream.close()
+
+
+def main(argv):
+    """
+    Command-line mode: classify samples (files, or one sample per line) across
+    a process pool and write one JSON result per sample, in input order.
+
+    Args:
+        argv (list): Command-line arguments (without the program name).
+    """
+    parser = argparse.ArgumentParser(description="Identify the cipher type of ciphertexts and solve them.")
+    parser.add_argument('inputs', nargs='+', help="Ciphertext files ('-' for stdin)")
+    parser.add_argument('--lines', action='store_true', help="Treat every non-blank line as its own sample")
+    parser.add_argument('--no-solve', action='store_true', help="Only rank the cipher types")
+    parser.add_argument('--processes', type=int, default=None, help="Worker processes (default: all CPUs)")
+    parser.add_argument('-o', '--output', default='-', help="JSONL output file ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    samples = read_samples(args.inputs, args.lines)
+    classify = partial(classify_sample, solve=not args.no_solve)
+    out_stream = sys.stdout if args.output == '-' else open(args.output, 'w')
+    try:
+        if args.processes == 1:
+            for result in map(classify, samples):
+                out_stream.write(json.dumps(result) + '\n')
+        else:
+            with Pool(args.processes) as pool:
+                for result in pool.imap(classify, samples, chunksize=BATCH_CHUNK_SAMPLES):
+                    out_stream.write(json.dumps(result) + '\n')
+    finally:
+        if out_stream is not sys.stdout:
+            out_stream.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        main(sys.argv[1:])
+        sys.exit(0)
+
+    print("--- Cipher Type Identifier ---")
+    message = input("Enter the ciphertext: ")
+    result = identify_and_solve(message)
+    if not result['ranking']:
+        print("Nothing to classify.")
+        sys.exit(0)
+    print("\nMost likely cipher types:")
+    for name, probability in result['ranking']:
+        script = CIPHER_SCRIPTS[name] or "no solver yet"
+        print(f"  {name:<13} {probability:6.1%}  ({script})")
+    if 'plaintext' in result:
+        print(f"\nSolved as {result['ranking'][0][0]}:")
+        print(result['plaintext'])
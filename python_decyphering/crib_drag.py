@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Many-Time-Pad Crib Dragging
+When several messages are XORed with the same keystream, C_i ^ C_j = P_i ^ P_j
+for every pair, so guessing a word (crib) in one message reveals the same
+positions in all of the others.
+
+All ciphertexts are XORed pairwise into one NumPy matrix, and a crib is slid
+across every pair and position at once instead of looping in Python.
+"""
+
+import sys
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Bytes that count as plausible plaintext
+PRINTABLE = np.zeros(256, dtype=bool)
+PRINTABLE[32:127] = True
+PRINTABLE[[9, 10, 13]] = True
+
+# Rows of the pairwise matrix scored per step, to bound memory with many samples
+ROW_BLOCK = 32
+
+
+def load_ciphertexts(ciphertexts):
+    """
+    Packs ciphertexts of different lengths into one zero-padded matrix.
+
+    Args:
+        ciphertexts (list): Ciphertexts as bytes or hex strings.
+
+    Returns:
+        tuple: (matrix, lengths) - uint8 array of shape (N, max_len) and
+            int array with the real length of each row.
+    """
+    ciphertexts = [bytes.fromhex(c) if isinstance(c, str) else bytes(c) for c in ciphertexts]
+    lengths = np.array([len(c) for c in ciphertexts], dtype=np.int64)
+    matrix = np.zeros((len(ciphertexts), int(lengths.max(initial=0))), dtype=np.uint8)
+    for row, ciphertext in enumerate(ciphertexts):
+        matrix[row, :len(ciphertext)] = np.frombuffer(ciphertext, dtype=np.uint8)
+    return matrix, lengths
+
+
+def pairwise_xor(matrix):
+    """
+    XORs every ciphertext with every other one.
+
+    Args:
+        matrix (np.ndarray): (N, L) ciphertext matrix.
+
+    Returns:
+        np.ndarray: (N, N, L) array where [i, j] = C_i ^ C_j = P_i ^ P_j.
+    """
+    return np.bitwise_xor(matrix[:, None, :], matrix[None, :, :])
+
+
+class CribDragger:
+    """
+    Crib-drag engine over a corpus of ciphertexts that share one keystream.
+    Keeps a partial keystream that grows as cribs are applied.
+    """
+
+    def __init__(self, ciphertexts):
+        """
+        Args:
+            ciphertexts (list): Ciphertexts as bytes or hex strings.
+        """
+        self.matrix, self.lengths = load_ciphertexts(ciphertexts)
+        self.pairs = pairwise_xor(self.matrix)
+        self.keystream = np.zeros(self.matrix.shape[1], dtype=np.uint8)
+        self.known = np.zeros(self.matrix.shape[1], dtype=bool)
+
+    def drag(self, crib, top=20):
+        """
+        Slides a crib over every ciphertext and position at once.
+
+        Placing the crib in ciphertext i at position p implies that every other
+        plaintext j reads (C_i ^ C_j)[p:p+len(crib)] ^ crib there. A placement
+        scores the fraction of those bytes that are printable.
+
+        Args:
+            crib (bytes or str): The guessed plaintext fragment.
+            top (int): How many placements to return.
+
+        Returns:
+            list: (score, text_no, position) tuples, best first.
+        """
+        if isinstance(crib, str):
+            crib = crib.encode('utf-8')
+        crib_len = len(crib)
+        count, max_len = self.matrix.shape
+        if crib_len == 0 or crib_len > max_len or count < 2:
+            return []
+        crib_array = np.frombuffer(crib, dtype=np.uint8)
+        positions = np.arange(max_len - crib_len + 1)
+
+        # covered[j, p]: ciphertext j is long enough to hold the crib at p
+        covered = positions[None, :] + crib_len <= self.lengths[:, None]
+        scores = np.zeros((count, len(positions)))
+
+        for start in range(0, count, ROW_BLOCK):
+            block = self.pairs[start:start + ROW_BLOCK]
+            windows = sliding_window_view(block, crib_len, axis=2)
+            printable = PRINTABLE[windows ^ crib_array].mean(axis=3)
+            # Only pairs where both texts cover the window and j != i count
+            mask = covered[None, :, :] & covered[start:start + ROW_BLOCK, None, :]
+            rows = np.arange(start, start + block.shape[0])
+            mask[np.arange(block.shape[0]), rows, :] = False
+            votes = mask.sum(axis=1)
+            scores[start:start + block.shape[0]] = np.where(
+                votes > 0, (printable * mask).sum(axis=1) / np.maximum(votes, 1), 0.0)
+
+        best = np.argsort(scores, axis=None)[::-1][:top]
+        text_nos, offsets = np.unravel_index(best, scores.shape)
+        return [(float(scores[i, p]), int(i), int(p)) for i, p in zip(text_nos, offsets)]
+
+    def apply(self, text_no, position, crib):
+        """
+        Fixes a crib in one ciphertext and records the keystream it implies.
+
+        Args:
+            text_no (int): Index of the ciphertext that contains the crib.
+            position (int): Offset of the crib inside that ciphertext.
+            crib (bytes or str): The plaintext fragment.
+        """
+        if isinstance(crib, str):
+            crib = crib.encode('utf-8')
+        end = position + len(crib)
+        if end > self.lengths[text_no]:
+            raise ValueError(f"Crib does not fit in ciphertext {text_no} at position {position}.")
+        crib_array = np.frombuffer(crib, dtype=np.uint8)
+        self.keystream[position:end] = self.matrix[text_no, position:end] ^ crib_array
+        self.known[position:end] = True
+
+    def decryptions(self, unknown=b'?'):
+        """
+        Decrypts every ciphertext with the partial keystream.
+
+        Args:
+            unknown (bytes): Placeholder for positions with no keystream yet.
+
+        Returns:
+            list: One bytes object per ciphertext.
+        """
+        plain = self.matrix ^ self.keystream
+        plain[:, ~self.known] = unknown[0]
+        return [plain[row, :length].tobytes() for row, length in enumerate(self.lengths)]
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python crib_drag.py <file_with_one_hex_ciphertext_per_line>")
+        sys.exit(1)
+
+    with open(sys.argv[1]) as f:
+        ciphertexts = [line.strip() for line in f if line.strip()]
+
+    dragger = CribDragger(ciphertexts)
+    print(f"Loaded {len(ciphertexts)} ciphertexts (longest {dragger.matrix.shape[1]} bytes).")
+    print("Commands:")
+    print("  drag <crib>                - Rank placements of a crib over all texts")
+    print("  apply <text_no> <pos> <crib> - Fix a crib and extend the keystream")
+    print("  show                       - Show current decryptions")
+    print("  key                        - Show the partial keystream (hex)")
+    print("  quit                       - Exit")
+
+    while True:
+        try:
+            cmd = input("\n> ").strip()
+        except EOFError:
+            break
+
+        try:
+            if cmd == "quit":
+                break
+            elif cmd == "show":
+                for i, dec in enumerate(dragger.decryptions()):
+                    print(f"{i:3d}: {dec}")
+            elif cmd == "key":
+                print("".join(f"{b:02x}" if known else "??"
+                              for b, known in zip(dragger.keystream, dragger.known)))
+            elif cmd.startswith("drag "):
+                crib = cmd.split(" ", 1)[1].encode()
+                for score, text_no, position in dragger.drag(crib):
+                    print(f"  score={score:.3f}  text={text_no:3d}  pos={position}")
+            elif cmd.startswith("apply "):
+                parts = cmd.split(" ", 3)
+                if len(parts) < 4:
+                    print("Usage: apply <text_no> <pos> <crib>")
+                    continue
+                dragger.apply(int(parts[1]), int(parts[2]), parts[3])
+                print(f"Applied crib '{parts[3]}' in text {parts[1]} at position {parts[2]}")
+            else:
+                print("Unknown command")
+        except Exception as e:
+            print(f"Error: {e}")
+
+
+if __name__ == "__main__":
+    main()
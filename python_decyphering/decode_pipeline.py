@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Chained Decode Pipeline
+Runs a CyberChef-style recipe such as base64 -> hex -> XOR -> ROT13 over a
+file or stdin in one go, instead of copy-pasting between the interactive
+decoders.
+
+Every stage is a generator that takes an iterable of byte chunks and yields
+byte chunks, so a recipe is just the stages wrapped around each other. Nothing
+runs until the output is consumed; each chunk read from the input then flows
+through the whole chain before the next one is read, and a stage only holds
+back the few bytes that do not form a complete group yet (a base64 quantum,
+an odd hex digit). Memory use stays constant whatever the input size.
+
+The XOR, hex and ROT/Atbash stages reuse the engines of xor_core and
+caesar_core.
+"""
+
+import argparse
+import base64
+import binascii
+import sys
+from functools import partial
+
+from caesar_core import ATBASH_BYTE_TABLE, BYTE_SHIFT_TABLES
+from xor_core import DEFAULT_CHUNK_SIZE, HEX_WHITESPACE, read_chunks, unhex_chunks, xor_stream
+
+# Base64 decoding accepts the URL-safe alphabet too
+URLSAFE_TABLE = bytes.maketrans(b'-_', b'+/')
+
+
+def regroup(chunks, group):
+    """
+    Re-cuts chunks of text encodings so every chunk but the last holds a
+    whole number of `group`-character blocks. Whitespace is dropped.
+
+    Args:
+        chunks: Iterable of byte chunks.
+        group (int): Block size of the encoding (4 for base64, 8 for base32).
+
+    Yields:
+        bytes: Aligned chunks; the last one may be a partial block.
+    """
+    pending = b''
+    for chunk in chunks:
+        text = pending + chunk.translate(None, HEX_WHITESPACE)
+        whole = len(text) - len(text) % group
+        pending = text[whole:]
+        if whole:
+            yield text[:whole]
+    if pending:
+        yield pending
+
+
+def pad(text, group):
+    """Adds the '=' padding that is often stripped from CTF blobs."""
+    return text + b'=' * (-len(text) % group)
+
+
+def base64_stage(chunks):
+    """Decodes standard or URL-safe base64."""
+    for text in regroup(chunks, 4):
+        yield base64.b64decode(pad(text, 4).translate(URLSAFE_TABLE), validate=True)
+
+
+def base32_stage(chunks):
+    """Decodes base32 (either case)."""
+    for text in regroup(chunks, 8):
+        yield base64.b32decode(pad(text, 8), casefold=True)
+
+
+def hex_stage(chunks):
+    """Decodes hex text, with or without a leading '0x'."""
+    chunks = iter(chunks)
+    for first in chunks:
+        first = first.lstrip()
+        if first:
+            break
+    else:
+        return
+    if first[:2].lower() == b'0x':
+        first = first[2:]
+    yield from unhex_chunks(_prepend(first, chunks))
+
+
+def _prepend(first, chunks):
+    yield first
+    yield from chunks
+
+
+def to_hex_stage(chunks):
+    """Encodes the bytes as hex text, e.g. to inspect a binary result."""
+    for chunk in chunks:
+        yield binascii.hexlify(chunk)
+
+
+def translate_stage(chunks, table):
+    """Runs every chunk through a bytes.translate table."""
+    for chunk in chunks:
+        yield chunk.translate(table)
+
+
+def xor_stage(chunks, key_bytes):
+    """XORs with a repeating key; the key position carries across chunks."""
+    return xor_stream(chunks, key_bytes)
+
+
+def _text_key(argument):
+    return argument.encode('utf-8')
+
+
+def _hex_key(argument):
+    return bytes.fromhex(argument)
+
+
+def _shift(argument):
+    return BYTE_SHIFT_TABLES[int(argument) % 26]
+
+
+# Stage name -> (stage function, parser of its argument or None, help text)
+STAGES = {
+    'base64': (base64_stage, None, "decode base64 (also URL-safe, padding optional)"),
+    'base32': (base32_stage, None, "decode base32"),
+    'hex': (hex_stage, None, "decode hex text"),
+    'tohex': (to_hex_stage, None, "encode as hex text"),
+    'xor': (xor_stage, _text_key, "XOR with a repeating text key, e.g. xor:secret"),
+    'xor-hex': (xor_stage, _hex_key, "XOR with a repeating hex key, e.g. xor-hex:2a"),
+    'rot13': (partial(translate_stage, table=BYTE_SHIFT_TABLES[13]), None, "apply ROT13"),
+    'rot': (translate_stage, _shift, "shift letters forward by N, e.g. rot:23"),
+    'atbash': (partial(translate_stage, table=ATBASH_BYTE_TABLE), None, "apply Atbash"),
+}
+
+
+def parse_recipe(steps):
+    """
+    Turns recipe steps into stage functions.
+
+    Args:
+        steps (list): Steps such as ['base64', 'hex', 'xor-hex:2a', 'rot13'];
+            a step may also hold several steps separated by '|'.
+
+    Returns:
+        list: Functions that each map an iterable of chunks to a generator.
+
+    Raises:
+        ValueError: On an unknown stage or a missing or invalid argument.
+    """
+    stages = []
+    for step in steps:
+        for part in step.split('|'):
+            name, has_argument, argument = part.strip().partition(':')
+            if not name:
+                continue
+            if name not in STAGES:
+                raise ValueError(f"Unknown stage '{name}'. Known stages: {', '.join(STAGES)}")
+            stage, parse_argument, _ = STAGES[name]
+            if parse_argument is None:
+                if has_argument:
+                    raise ValueError(f"Stage '{name}' takes no argument.")
+                stages.append(stage)
+                continue
+            try:
+                value = parse_argument(argument)
+            except ValueError:
+                value = None
+            if not value:
+                raise ValueError(f"Stage '{name}' needs a valid argument ({STAGES[name][2]}).")
+            stages.append(partial(_bound_stage, stage, value))
+    return stages
+
+
+def _bound_stage(stage, value, chunks):
+    return stage(chunks, value)
+
+
+def run_pipeline(chunks, stages):
+    """
+    Chains the stages lazily over a sequence of chunks.
+
+    Args:
+        chunks: Iterable of byte chunks (e.g. from xor_core.read_chunks).
+        stages (list): Output of parse_recipe.
+
+    Returns:
+        generator: The output chunks; nothing is read before it is iterated.
+    """
+    for stage in stages:
+        chunks = stage(chunks)
+    return iter(chunks)
+
+
+def decode_bytes(data, recipe):
+    """
+    Runs a recipe over an in-memory buffer.
+
+    Args:
+        data (bytes or str): The input.
+        recipe (list): Recipe steps, as for parse_recipe.
+
+    Returns:
+        bytes: The decoded output.
+    """
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return b''.join(run_pipeline([data], parse_recipe(recipe)))
+
+
+def main(argv):
+    """
+    Command-line mode: run a recipe over a file or stdin in chunks.
+
+    Args:
+        argv (list): Command-line arguments (without the program name).
+    """
+    stage_help = "\n".join(f"  {name:<8} {help_text}" for name, (_, _, help_text) in STAGES.items())
+    parser = argparse.ArgumentParser(
+        description="Decode a file or stdin through a chain of stages, e.g. base64 hex xor-hex:2a rot13.",
+        epilog="stages:\n" + stage_help, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('recipe', nargs='+', help="Stages in order (name or name:argument)")
+    parser.add_argument('-i', '--input', default='-', help="Input file ('-' for stdin)")
+    parser.add_argument('-o', '--output', default='-', help="Output file ('-' for stdout)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"Bytes read per chunk (default {DEFAULT_CHUNK_SIZE})")
+    args = parser.parse_args(argv)
+
+    try:
+        stages = parse_recipe(args.recipe)
+    except ValueError as e:
+        parser.error(str(e))
+
+    in_stream = sys.stdin.buffer if args.input == '-' else open(args.input, 'rb')
+    out_stream = sys.stdout.buffer if args.output == '-' else open(args.output, 'wb')
+    total = 0
+    try:
+        for chunk in run_pipeline(read_chunks(in_stream, args.chunk_size), stages):
+            out_stream.write(chunk)
+            total += len(chunk)
+    except ValueError as e:
+        parser.error(f"Invalid input after {total} output bytes: {e}")
+    finally:
+        if in_stream is not sys.stdin.buffer:
+            in_stream.close()
+        if out_stream is not sys.stdout.buffer:
+            out_stream.close()
+    print(f"Wrote {total} bytes.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        main(sys.argv[1:])
+        sys.exit(0)
+
+    print("--- Chained Decode Pipeline ---")
+    print("Stages: " + ", ".join(STAGES))
+    recipe = input("Enter the recipe (e.g. base64 | hex | xor-hex:2a | rot13): ")
+    message = input("Enter the input: ")
+    try:
+        result = decode_bytes(message.strip(), [recipe])
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    print("\nOutput:")
+    print(result.decode('utf-8', errors='replace'))
@@ -3,6 +3,9 @@
 Find the FULL XOR key by analyzing patterns and trying to extend it.
 """
 
+from xor_core import repeating_key_xor
+from xor_crib_search import ANCHOR_ANY, ANCHOR_END, search_cribs
+
 hex_cipher = '0e0b213f26041e480b26217f27342e175d0e070a3c5b103e2526217f27342e175d0e077e263451150104'
 known_plain = 'crypto{'
 
@@ -36,8 +39,12 @@ print("-" * 80)
 # Let's try to extract more of the key by making assumptions
 # If crypto{ is at position 0, and the same plaintext pattern appears elsewhere...
 
-# Try different key lengths that divide into the repeating distance
-for key_len in [8, 16]:
+# Instead of guessing lengths, check every key length and crib placement at once
+crib_results = search_cribs(cipher_bytes, {known_plain: (known_plain.encode(), ANCHOR_ANY),
+                                           '}': (b'}', ANCHOR_END)}, top=3)
+candidate_lengths = list(dict.fromkeys(key_len for key_len, *_ in crib_results))
+
+for key_len in candidate_lengths:
     print(f"\nTrying key length: {key_len}")
     
     # Build the key iteratively
@@ -50,11 +57,9 @@ for key_len in [8, 16]:
         key_confidence[i] += 10
     
     # Now try to decrypt and look for patterns
-    decrypted = bytearray()
-    for i in range(len(cipher_bytes)):
-        decrypted.append(cipher_bytes[i] ^ key[i % key_len])
+    decrypted = repeating_key_xor(cipher_bytes, bytes(key))
     
-    decrypted_str = bytes(decrypted).decode('utf-8', errors='replace')
+    decrypted_str = decrypted.decode('utf-8', errors='replace')
     print(f"  Key (hex): {bytes(key).hex()}")
     print(f"  Key (str): '{bytes(key).decode('utf-8', errors='replace')}'")
     print(f"  Decrypted: {decrypted_str}")
@@ -83,12 +88,6 @@ test_keys = [
     b'myXORk3y',
 ]
 
-def repeating_key_xor(ciphertext_bytes, key_bytes):
-    decrypted_bytes = bytearray()
-    for i in range(len(ciphertext_bytes)):
-        decrypted_bytes.append(ciphertext_bytes[i] ^ key_bytes[i % len(key_bytes)])
-    return bytes(decrypted_bytes)
-
 print("Testing common key variations:")
 print("-" * 80)
 for test_key in test_keys:
@@ -4,6 +4,8 @@ Find XOR key using known plaintext attack.
 We know the plaintext contains "crypto{" and can use this to find the key.
 """
 
+from xor_core import repeating_key_xor
+
 hex_cipher = '0e0b213f26041e480b26217f27342e175d0e070a3c5b103e2526217f27342e175d0e077e263451150104'
 known_plain = 'crypto{'
 
@@ -18,14 +20,6 @@ print(f"Ciphertext length: {len(cipher_bytes)} bytes")
 print("=" * 80)
 print()
 
-def repeating_key_xor(ciphertext_bytes, key_bytes):
-    if not key_bytes:
-        return ciphertext_bytes
-    decrypted_bytes = bytearray()
-    for i in range(len(ciphertext_bytes)):
-        decrypted_bytes.append(ciphertext_bytes[i] ^ key_bytes[i % len(key_bytes)])
-    return bytes(decrypted_bytes)
-
 # First, try single-byte XOR
 print("1. Testing Single-Byte XOR")
 print("-" * 80)
@@ -40,7 +34,7 @@ for offset in range(len(cipher_bytes) - len(known_plain) + 1):
         print(f"! Found single-byte XOR key at offset {offset}!")
         print(f"  Key: {key} (0x{key:02x}, ASCII: '{chr(key) if 32<=key<=126 else '?'}')")
         
-        decrypted = bytes([b ^ key for b in cipher_bytes])
+        decrypted = repeating_key_xor(cipher_bytes, bytes([key]))
         try:
             decrypted_str = decrypted.decode('utf-8')
             print(f"  Decryption: {decrypted_str}")
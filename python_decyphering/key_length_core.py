@@ -0,0 +1,38 @@
+"""
+Shared key-length rule used by the Vigenère and XOR breakers.
+
+Repeating a key twice gives a key of twice the length that decrypts just as
+well, and the extra freedom always lets the longer key fit the statistics a
+little better. Every breaker therefore prefers a length over its multiples
+unless the multiple scores clearly higher. Each caller passes its own
+tolerance, since the scores it compares differ in scale and noise.
+"""
+
+
+def drop_overfit_multiples(candidates, length_key, score_key, tolerance, same_key=None):
+    """
+    Drops every candidate whose length is a multiple of a shorter candidate's
+    length when the shorter one scores almost as well.
+
+    Args:
+        candidates (list): The candidates, in any order.
+        length_key (callable): Returns the key length of a candidate.
+        score_key (callable): Returns the score of a candidate (higher is better).
+        tolerance (float): Share of the longer candidate's score the shorter
+            one needs to reach for the longer one to be dropped.
+        same_key (callable): Optional check (shorter, longer) -> bool that the
+            two candidates agree, e.g. on known key bytes; without it any
+            shorter divisor counts.
+
+    Returns:
+        list: The kept candidates, in their original order.
+    """
+    kept = []
+    for candidate in candidates:
+        length, score = length_key(candidate), score_key(candidate)
+        if not any(length_key(other) < length and length % length_key(other) == 0
+                   and score_key(other) >= tolerance * score
+                   and (same_key is None or same_key(other, candidate))
+                   for other in candidates):
+            kept.append(candidate)
+    return kept
@@ -1,53 +1,19 @@
-# Morse Code dictionary for translation
-MORSE_CODE_DICT = {
-    '.-': 'A', '-...': 'B', '-.-.': 'C', '-..': 'D', '.': 'E',
-    '..-.': 'F', '--.': 'G', '....': 'H', '..': 'I', '.---': 'J',
-    '-.-': 'K', '.-..': 'L', '--': 'M', '-.': 'N', '---': 'O',
-    '.--.': 'P', '--.-': 'Q', '.-.': 'R', '...': 'S', '-': 'T',
-    '..-': 'U', '...-': 'V', '.--': 'W', '-..-': 'X', '-.--': 'Y',
-    '--..': 'Z', '-----': '0', '.----': '1', '..---': '2',
-    '...--': '3', '....-': '4', '.....': '5', '-....': '6',
-    '--...': '7', '---..': '8', '----.': '9', '.-.-.-': '.',
-    '--..--': ',', '..--..': '?', '-..-.': '/', '-.--.': '(',
-    '-.--.-': ')', '-....-': '-', '.-...': '&', '.--.-.': '@'
-}
-
-def morse_to_text(morse_code):
-    """
-    Translates a string of Morse code to English text.
+import sys
 
-    Args:
-        morse_code (str): The Morse code string. It's assumed that
-                          letters are separated by a single space ' '
-                          and words are separated by a forward slash '/'.
+from morse_core import CODE_TO_CHAR, morse_to_text, stream_main
 
-    Returns:
-        str: The translated English text.
-    """
-    translated_message = ""
-    
-    # Split the morse code into words
-    words = morse_code.strip().split(' / ')
-    
-    for word in words:
-        # Split each word into letters
-        letters = word.split(' ')
-        for morse_char in letters:
-            if morse_char in MORSE_CODE_DICT:
-                translated_message += MORSE_CODE_DICT[morse_char]
-            elif morse_char == "":
-                continue # Ignore multiple spaces
-            else:
-                translated_message += '?' # Placeholder for unknown code
-        
-        # Add a space after each word
-        translated_message += ' '
-        
-    return translated_message.strip()
+# Morse Code dictionary for translation
+MORSE_CODE_DICT = CODE_TO_CHAR
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        # Streaming mode: python morse_code.py -i FILE [-o FILE] [--no-segment]
+        stream_main(sys.argv[1:], "Decode Morse code from a file or stdin in chunks.", decode=True)
+        sys.exit(0)
+
     print("--- Morse Code to Text Translator ---")
     print("Enter Morse code. Use spaces between letters and ' / ' between words.")
+    print("Runs of code without letter spaces are split into the most English-like letters.")
     example = ".... . .-.. .-.. --- / .-- --- .-. .-.. -.."
     print(f"Example: '{example}' translates to 'HELLO WORLD'")
     
@@ -0,0 +1,423 @@
+"""
+Shared Morse engine used by the Morse encoder and decoder.
+
+Codes are decoded by walking a binary trie, one dot or dash per step. The
+decoder is a generator over input chunks that carries the unfinished code
+across chunk boundaries, so input of any size is decoded with constant
+memory and output appears as it is read.
+
+Letters are normally separated by spaces and words by '/'. When the letter
+gaps are missing, a run of dots and dashes is split back into letters by a
+Viterbi search scored with English quadgrams from ngram_scorer. The best
+decoding of every prefix is kept in a table and reused, so the work grows
+linearly with the run instead of with the number of possible splits.
+"""
+
+import argparse
+import re
+from functools import lru_cache
+
+from xor_core import add_stream_arguments, open_streams
+
+MORSE_CODE = {
+    'A': '.-', 'B': '-...', 'C': '-.-.', 'D': '-..', 'E': '.', 'F': '..-.',
+    'G': '--.', 'H': '....', 'I': '..', 'J': '.---', 'K': '-.-', 'L': '.-..',
+    'M': '--', 'N': '-.', 'O': '---', 'P': '.--.', 'Q': '--.-', 'R': '.-.',
+    'S': '...', 'T': '-', 'U': '..-', 'V': '...-', 'W': '.--', 'X': '-..-',
+    'Y': '-.--', 'Z': '--..', '0': '-----', '1': '.----', '2': '..---',
+    '3': '...--', '4': '....-', '5': '.....', '6': '-....', '7': '--...',
+    '8': '---..', '9': '----.', '.': '.-.-.-', ',': '--..--', '?': '..--..',
+    '/': '-..-.', '(': '-.--.', ')': '-.--.-', '-': '-....-', '&': '.-...',
+    '@': '.--.-.'
+}
+CODE_TO_CHAR = {code: char for char, code in MORSE_CODE.items()}
+MAX_CODE_LENGTH = max(map(len, CODE_TO_CHAR))
+
+# Placeholder for codes that are not in the table
+UNKNOWN = '?'
+
+# An unspaced run longer than this is decoded without waiting for its end
+MAX_SEGMENT = 1 << 16
+
+# Contexts kept per position by the segmentation search
+BEAM_WIDTH = 32
+
+# Log10 bonus per decoded letter; without it the search prefers a few long
+# codes over the right number of short ones
+LETTER_BONUS = 0.5
+
+# Tokens: a code (or unspaced run), a word separator, or a line break
+TOKEN_PATTERN = re.compile(r'[^\s/|]+|[/|]|\n')
+
+
+def build_trie(codes):
+    """
+    Builds a binary trie of Morse codes as flat lists.
+
+    Args:
+        codes (dict): Morse code -> character.
+
+    Returns:
+        tuple: (children, chars) where children[node] is [dot child, dash
+            child] (-1 if absent) and chars[node] is the character ending
+            at that node or None. Node 0 is the root.
+    """
+    children = [[-1, -1]]
+    chars = [None]
+    for code, char in codes.items():
+        node = 0
+        for symbol in code:
+            branch = 0 if symbol == '.' else 1
+            if children[node][branch] < 0:
+                children[node][branch] = len(children)
+                children.append([-1, -1])
+                chars.append(None)
+            node = children[node][branch]
+        chars[node] = char
+    return children, chars
+
+
+TRIE_CHILDREN, TRIE_CHARS = build_trie(CODE_TO_CHAR)
+
+
+def lookup(code):
+    """
+    Walks the trie for one code.
+
+    Args:
+        code (str): Dots and dashes.
+
+    Returns:
+        str: The character, or None if the code is unknown.
+    """
+    node = 0
+    for symbol in code:
+        if symbol == '.':
+            node = TRIE_CHILDREN[node][0]
+        elif symbol == '-':
+            node = TRIE_CHILDREN[node][1]
+        else:
+            return None
+        if node < 0:
+            return None
+    return TRIE_CHARS[node]
+
+
+@lru_cache(maxsize=None)
+def letter_model():
+    """
+    Loads the unigram, bigram and quadgram log probabilities as plain lists,
+    which are faster than NumPy arrays for one lookup at a time. The values
+    stay scaled by ngram_scorer.SCALE.
+    """
+    from ngram_scorer import get_scorer
+    return tuple(get_scorer(n).table.tolist() for n in (1, 2, 4))
+
+
+def segment_table(symbols, beam_width=BEAM_WIDTH, context=()):
+    """
+    Runs the segmentation search over a run of dots and dashes.
+
+    This is a Viterbi search whose state is the position in the run plus the
+    last three letters decoded. best[i] holds the best decoding of the first
+    i symbols for each three-letter context, so each prefix is solved once
+    and extended by following the trie for up to four symbols (the longest
+    letter code). Each new letter is scored with the quadgram it completes.
+    Only the beam_width best contexts of a prefix are extended.
+
+    Args:
+        symbols (str): Dots and dashes only.
+        beam_width (int): Contexts kept per position.
+        context (tuple): Letter indices decoded just before the run.
+
+    Returns:
+        list: best[i] maps a context to (score, previous position, previous
+            context, letter index) for every position i of the run.
+    """
+    from ngram_scorer import SCALE
+    unigrams, bigrams, quadgrams = letter_model()
+    bonus = LETTER_BONUS * SCALE
+    n = len(symbols)
+    # best[i]: context -> (score, previous position, previous context, letter)
+    best = [{} for _ in range(n + 1)]
+    best[0][tuple(context[-3:])] = (0.0, 0, (), 0)
+
+    for start in range(n):
+        contexts = best[start]
+        if not contexts:
+            continue
+        if len(contexts) > beam_width:
+            kept = sorted(contexts.items(), key=lambda item: item[1][0], reverse=True)[:beam_width]
+            contexts = best[start] = dict(kept)
+        node = 0
+        for end in range(start, n):
+            node = TRIE_CHILDREN[node][0 if symbols[end] == '.' else 1]
+            if node < 0:
+                break
+            char = TRIE_CHARS[node]
+            if char is None or not 'A' <= char <= 'Z':
+                continue
+            letter = ord(char) - ord('A')
+            target = best[end + 1]
+            for context, (score, _, _, _) in contexts.items():
+                if len(context) == 3:
+                    gain = quadgrams[((context[0] * 26 + context[1]) * 26 + context[2]) * 26 + letter]
+                elif context:
+                    gain = bigrams[context[-1] * 26 + letter]
+                else:
+                    gain = unigrams[letter]
+                new_score = score + gain + bonus
+                new_context = (context + (letter,))[-3:]
+                if new_context not in target or target[new_context][0] < new_score:
+                    target[new_context] = (new_score, start, context, letter)
+    return best
+
+
+def trace_path(best, position, context):
+    """
+    Follows the back-pointers of segment_table from one end state.
+
+    Returns:
+        list: (position, context, letter index) of every letter on the path,
+            last letter first; position is where the letter ends.
+    """
+    path = []
+    while position > 0:
+        _, previous_position, previous_context, letter = best[position][context]
+        path.append((position, context, letter))
+        position, context = previous_position, previous_context
+    return path
+
+
+def path_letters(path):
+    """Returns the letters of a traced path in reading order."""
+    return ''.join(chr(ord('A') + letter) for _, _, letter in reversed(path))
+
+
+def segment_letters(symbols, beam_width=BEAM_WIDTH, context=()):
+    """
+    Splits a run of dots and dashes without letter gaps into the most
+    English-like sequence of letters.
+
+    Args:
+        symbols (str): Dots and dashes only.
+        beam_width (int): Contexts kept per position.
+        context (tuple): Letter indices decoded just before the run.
+
+    Returns:
+        str: The decoded letters.
+    """
+    best = segment_table(symbols, beam_width, context)
+    n = len(symbols)
+    end = max(best[n], key=lambda c: best[n][c][0])
+    return path_letters(trace_path(best, n, end))
+
+
+def segment_prefix(symbols, beam_width=BEAM_WIDTH, context=()):
+    """
+    Decodes the start of a run that is too long to wait for, without cutting
+    through a letter.
+
+    The run may continue in the next chunk, so its true decoding can end at
+    any letter boundary in the last MAX_CODE_LENGTH symbols. The best paths to
+    all those boundaries share their letters up to where their back-pointers
+    meet; later symbols cannot change that part. If they never meet, the best
+    decoding is cut at its last letter boundary in the first half of the run.
+
+    Args:
+        symbols (str): Dots and dashes only.
+        beam_width (int): Contexts kept per position.
+        context (tuple): Letter indices decoded just before the run.
+
+    Returns:
+        tuple: (letters, consumed) with the decoded letters and how many
+            symbols they cover; the rest should be decoded later.
+    """
+    best = segment_table(symbols, beam_width, context)
+    n = len(symbols)
+    best_path = trace_path(best, n, max(best[n], key=lambda c: best[n][c][0]))
+    on_best = {(position, ctx): i for i, (position, ctx, _) in enumerate(best_path)}
+    # Index in best_path (last letter first) of the latest state all paths share
+    shared = 0
+    for end_position in range(max(1, n - MAX_CODE_LENGTH + 1), n + 1):
+        ends = sorted(best[end_position], key=lambda c: best[end_position][c][0], reverse=True)
+        for ctx in ends[:beam_width]:
+            position = end_position
+            while position > 0 and (position, ctx) not in on_best:
+                _, position, ctx, _ = best[position][ctx]
+            shared = max(shared, on_best.get((position, ctx), len(best_path)))
+    if shared == len(best_path):
+        # No agreement: cut the best decoding at a letter boundary instead
+        shared = next((i for i, (position, _, _) in enumerate(best_path) if position <= n // 2),
+                      len(best_path) - 1)
+    prefix = best_path[shared:]
+    return path_letters(prefix), prefix[0][0]
+
+
+def decode_token(token, segment=True, context=()):
+    """
+    Decodes one whitespace-delimited token.
+
+    Args:
+        token (str): A single code, or an unspaced run of codes.
+        segment (bool): Split unknown runs of dots and dashes into letters.
+        context (tuple): Letter indices decoded just before the token, when
+            it continues a run whose start was already decoded.
+
+    Returns:
+        str: The decoded character(s), or UNKNOWN.
+    """
+    char = lookup(token) if len(token) <= MAX_CODE_LENGTH and not context else None
+    if char is not None:
+        return char
+    if segment and not token.strip('.-'):
+        return segment_letters(token, context=context)
+    return UNKNOWN
+
+
+def letter_context(letters):
+    """Returns the letter indices of the last three letters, for segmentation."""
+    return tuple(ord(c) - ord('A') for c in letters[-3:] if 'A' <= c <= 'Z')
+
+
+def settle_run(run, context=(), max_segment=MAX_SEGMENT):
+    """
+    Decodes the settled start of a run of dots and dashes until at most
+    max_segment symbols are left. The run is searched in windows of
+    2 * max_segment symbols, so the segmentation table stays bounded however
+    long the run is.
+
+    Args:
+        run (str): Dots and dashes only.
+        context (tuple): Letter indices decoded just before the run.
+        max_segment (int): Longest run left undecoded.
+
+    Returns:
+        tuple: (letters, rest, context) with the decoded letters, the symbols
+            still to decode and the letter context they continue from.
+    """
+    letters = []
+    while len(run) > max_segment:
+        settled, consumed = segment_prefix(run[:2 * max_segment], context=context)
+        letters.append(settled)
+        context = (context + letter_context(settled))[-3:]
+        run = run[consumed:]
+    return ''.join(letters), run, context
+
+
+def decode_stream(chunks, segment=True, max_segment=MAX_SEGMENT):
+    """
+    Decodes Morse code chunk by chunk.
+
+    Letters are separated by whitespace, words by '/' (or '|'); line breaks
+    are kept. A code cut by a chunk boundary is carried into the next chunk.
+    An unspaced run that grows past max_segment has its settled start
+    decoded early (see segment_prefix) and only the rest is carried.
+
+    Args:
+        chunks: Iterable of str chunks.
+        segment (bool): Split runs without letter gaps into letters.
+        max_segment (int): Longest run held back waiting for its end.
+
+    Yields:
+        str: Decoded text as it becomes available.
+    """
+    carry = ''
+    # Context of a run whose start was already decoded, () otherwise
+    run_context = ()
+    started = False
+    pending_space = False
+    for chunk in chunks:
+        buffer = carry + chunk
+        tokens = TOKEN_PATTERN.findall(buffer)
+        carry = ''
+        # The last code may continue in the next chunk
+        if tokens and buffer[-1] not in ' \t\r\n/|':
+            carry = tokens.pop()
+        for token in tokens:
+            if token == '\n':
+                yield '\n'
+                started = pending_space = False
+            elif token in '/|':
+                pending_space = started
+            else:
+                if pending_space:
+                    yield ' '
+                    pending_space = False
+                if segment and len(token) > max_segment and not token.strip('.-'):
+                    letters, token, run_context = settle_run(token, run_context, max_segment)
+                    yield letters
+                yield decode_token(token, segment, run_context)
+                started = True
+            run_context = ()
+        if len(carry) > max_segment:
+            if pending_space:
+                yield ' '
+                pending_space = False
+            if segment and not carry.strip('.-'):
+                letters, carry, run_context = settle_run(carry, run_context, max_segment)
+                yield letters
+            else:
+                yield decode_token(carry, segment)
+                carry = ''
+            started = True
+    if carry:
+        if pending_space:
+            yield ' '
+        yield decode_token(carry, segment, run_context)
+
+
+def morse_to_text(morse_code, segment=True):
+    """
+    Decodes a whole Morse string.
+
+    Args:
+        morse_code (str): Codes separated by spaces, words by ' / '.
+        segment (bool): Split runs without letter gaps into letters.
+
+    Returns:
+        str: The decoded text.
+    """
+    return ''.join(decode_stream([morse_code], segment)).strip()
+
+
+def text_to_morse(text):
+    """
+    Encodes text as Morse code.
+
+    Args:
+        text (str): The text to encode.
+
+    Returns:
+        str: Codes separated by spaces and words by ' / '; characters without
+            a code become '?'.
+    """
+    return ' / '.join(' '.join([MORSE_CODE.get(char, UNKNOWN) for char in word])
+                      for word in text.upper().split())
+
+
+def stream_main(argv, description, decode=False):
+    """
+    Command-line entry point of the Morse tools. Encoding works line by line;
+    decoding streams the input in chunks.
+
+    Args:
+        argv (list): Command-line arguments (without the program name).
+        description (str): Help text shown by --help.
+        decode (bool): Decode Morse instead of encoding text.
+    """
+    parser = argparse.ArgumentParser(description=description)
+    add_stream_arguments(parser, 'Characters' if decode else None)
+    if decode:
+        parser.add_argument('--no-segment', action='store_true',
+                            help="Print '?' for runs without letter gaps instead of splitting them")
+    args = parser.parse_args(argv)
+
+    with open_streams(args.input, args.output, binary=False) as (in_stream, out_stream):
+        if decode:
+            chunks = iter(lambda: in_stream.read(args.chunk_size), '')
+            for text in decode_stream(chunks, segment=not args.no_segment):
+                out_stream.write(text)
+        else:
+            for line in in_stream:
+                out_stream.write(text_to_morse(line) + '\n')
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+N-gram Language-Model Scorer
+Scores candidate plaintexts with English unigram, bigram and quadgram
+log-probabilities, shared by the XOR, Caesar, Vigenère and substitution
+breakers.
+
+The tables are built once from a corpus and shipped in ngram_data/ as raw
+little-endian int16 arrays holding log10 probabilities scaled by 1000. They
+are memory-mapped on first use, so loading is instant and several processes
+(pool workers included) share the same pages. Scoring is vectorized with
+NumPy straight from the int16 map; sums are taken as integers and scaled
+once per result, so no float copy of a table is ever made.
+
+The shipped tables were built from a small corpus (see the README). That is
+enough for unigrams and bigrams, but over 90% of the 456,976 quadgrams never
+occur and share the floor value, and the rest take only a few hundred
+distinct values. Quadgram scores therefore separate English from
+non-English well but rank close English candidates coarsely; rebuild the
+tables from a large general corpus (tens of millions of letters) with
+`python ngram_scorer.py build` for better quadgram statistics.
+"""
+
+import os
+import sys
+from functools import lru_cache
+
+import numpy as np
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ngram_data')
+
+# Stored value = round(log10(probability) * SCALE)
+SCALE = 1000
+TABLE_DTYPE = np.dtype('<i2')
+
+# Letter n-gram orders that are shipped, plus the raw byte unigram table
+LETTER_ORDERS = (1, 2, 4)
+BYTE_TABLE = 'english_bytes.bin'
+
+# Maps every byte to its letter index (A/a=0 ... Z/z=25) or 255 for non-letters
+LETTER_INDEX = np.full(256, 255, dtype=np.uint8)
+LETTER_INDEX[np.frombuffer(b'ABCDEFGHIJKLMNOPQRSTUVWXYZ', dtype=np.uint8)] = np.arange(26)
+LETTER_INDEX[np.frombuffer(b'abcdefghijklmnopqrstuvwxyz', dtype=np.uint8)] = np.arange(26)
+
+
+def table_path(name, data_dir=DATA_DIR):
+    """Return the path of a table file inside data_dir."""
+    return os.path.join(data_dir, name)
+
+
+def letter_table_name(n):
+    """Return the file name of the letter n-gram table of order n."""
+    return f'english_{n}grams.bin'
+
+
+@lru_cache(maxsize=None)
+def load_table(name, data_dir=DATA_DIR):
+    """
+    Memory-maps a table once per process; nothing is read until it is used.
+
+    Args:
+        name (str): File name inside data_dir.
+        data_dir (str): Directory holding the tables.
+
+    Returns:
+        np.ndarray: Read-only int16 memmap of scaled log10 probabilities.
+    """
+    return np.memmap(table_path(name, data_dir), dtype=TABLE_DTYPE, mode='r')
+
+
+def text_to_indices(text):
+    """
+    Converts text to an array of letter indices, dropping everything else.
+
+    Args:
+        text (str or bytes): The text.
+
+    Returns:
+        np.ndarray: uint8 array with values 0-25.
+    """
+    if isinstance(text, str):
+        text = text.encode('latin-1', errors='ignore')
+    indices = LETTER_INDEX[np.frombuffer(text, dtype=np.uint8)]
+    return indices[indices != 255]
+
+
+def ngram_indices(letters, n):
+    """
+    Combines n consecutive letter indices into one base-26 table index.
+
+    Args:
+        letters (np.ndarray): Letter indices (0-25).
+        n (int): The n-gram order.
+
+    Returns:
+        np.ndarray: int64 array of len(letters) - n + 1 table indices.
+    """
+    count = len(letters) - n + 1
+    if count <= 0:
+        return np.zeros(0, dtype=np.int64)
+    index = np.zeros(count, dtype=np.int64)
+    for offset in range(n):
+        index = index * 26 + letters[offset:offset + count]
+    return index
+
+
+class NgramScorer:
+    """
+    Log-probability scorer for one letter n-gram order.
+    Higher scores (closer to zero) mean more English-like text.
+    """
+
+    def __init__(self, n=4, data_dir=DATA_DIR):
+        """
+        Args:
+            n (int): The n-gram order (1, 2 or 4 are shipped).
+            data_dir (str): Directory holding the tables.
+        """
+        self.n = n
+        # int16 memmap of log10 probabilities scaled by SCALE
+        self.table = load_table(letter_table_name(n), data_dir)
+
+    def score_indices(self, letters):
+        """
+        Scores an array of letter indices.
+
+        Args:
+            letters (np.ndarray): Letter indices (0-25).
+
+        Returns:
+            float: Sum of log10 probabilities of all n-grams.
+        """
+        return int(self.table[ngram_indices(letters, self.n)].sum(dtype=np.int64)) / SCALE
+
+    def score(self, text):
+        """
+        Scores text; non-letters are ignored.
+
+        Args:
+            text (str or bytes): The candidate plaintext.
+
+        Returns:
+            float: Sum of log10 probabilities of all n-grams.
+        """
+        return self.score_indices(text_to_indices(text))
+
+    def score_normalized(self, text):
+        """Scores text per n-gram so texts of different lengths compare."""
+        letters = text_to_indices(text)
+        count = len(letters) - self.n + 1
+        return self.score_indices(letters) / count if count > 0 else float('-inf')
+
+
+@lru_cache(maxsize=None)
+def get_scorer(n=4, data_dir=DATA_DIR):
+    """Return a shared NgramScorer, so each table is loaded once per process."""
+    return NgramScorer(n, data_dir)
+
+
+def byte_weights(data_dir=DATA_DIR):
+    """
+    Returns per-byte log10 probabilities of raw English text.
+
+    The list can be passed as `weights` to the histogram-based XOR scorers
+    (xor_decipher.single_byte_xor_scores and friends).
+
+    Returns:
+        list: 256 floats, indexed by byte value.
+    """
+    return (np.asarray(load_table(BYTE_TABLE, data_dir), dtype=np.float64) / SCALE).tolist()
+
+
+def log_prob_table(counts):
+    """
+    Converts raw counts to scaled int16 log10 probabilities.
+    Unseen entries get a floor of one hundredth of a single occurrence.
+    """
+    counts = counts.astype(np.float64)
+    total = counts.sum()
+    floor = 0.01 / total
+    log_probs = np.log10(np.maximum(counts / total, floor))
+    return np.round(log_probs * SCALE).astype(TABLE_DTYPE)
+
+
+def build_tables(corpus_paths, data_dir=DATA_DIR):
+    """
+    Builds all tables from one or more plain-text corpus files.
+
+    Args:
+        corpus_paths (list): Paths of UTF-8/ASCII English text files.
+        data_dir (str): Directory the tables are written to.
+    """
+    os.makedirs(data_dir, exist_ok=True)
+    byte_counts = np.zeros(256, dtype=np.int64)
+    letter_counts = {n: np.zeros(26 ** n, dtype=np.int64) for n in LETTER_ORDERS}
+
+    for path in corpus_paths:
+        with open(path, 'rb') as f:
+            data = f.read().replace(b'\r\n', b'\n')
+        byte_counts += np.bincount(np.frombuffer(data, dtype=np.uint8), minlength=256)
+        letters = text_to_indices(data)
+        for n in LETTER_ORDERS:
+            letter_counts[n] += np.bincount(ngram_indices(letters, n), minlength=26 ** n)
+
+    log_prob_table(byte_counts).tofile(table_path(BYTE_TABLE, data_dir))
+    for n in LETTER_ORDERS:
+        log_prob_table(letter_counts[n]).tofile(table_path(letter_table_name(n), data_dir))
+    load_table.cache_clear()
+    get_scorer.cache_clear()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 3 and sys.argv[1] == 'build':
+        build_tables(sys.argv[2:])
+        print(f"Tables written to {DATA_DIR}")
+    elif len(sys.argv) >= 2:
+        text = " ".join(sys.argv[1:])
+        for n in LETTER_ORDERS:
+            print(f"{n}-gram score per n-gram: {get_scorer(n).score_normalized(text):.3f}")
+    else:
+        print("Usage: python ngram_scorer.py build <corpus.txt> [...]")
+        print("       python ngram_scorer.py <text to score>")
@@ -0,0 +1,213 @@
+"""
+Shared Polybius square engine used by the Polybius encrypter and decrypter.
+
+A square is described by its alphabet read row by row: the standard 5x5
+square (I and J share a cell), the 6x6 square with digits, or either one
+mixed with a keyword. The encode and decode tables of a square are built once
+and cached. Encoding is a single str.translate that maps each letter to its
+coordinate pair, and decoding turns all digit pairs into cell indices with
+NumPy and looks the letters up in one array indexing step.
+
+A square with an unknown keyword is a monoalphabetic substitution over its
+cells, so it is broken with the quadgram hill climber of substitution_solver.
+"""
+
+import argparse
+import string
+import sys
+from functools import lru_cache
+
+import numpy as np
+
+ALPHABETS = {
+    5: "ABCDEFGHIKLMNOPQRSTUVWXYZ",  # I/J are combined
+    6: string.ascii_uppercase + string.digits,
+}
+
+# Placeholder for digit pairs that fall outside the square
+UNKNOWN = '?'
+
+
+def keyed_alphabet(keyword='', size=5):
+    """
+    Builds the alphabet of a keyword-mixed square: the keyword's letters
+    without repeats, followed by the rest of the standard alphabet.
+
+    Args:
+        keyword (str): The keyword (case and unknown characters are ignored).
+        size (int): 5 or 6.
+
+    Returns:
+        str: The size*size characters of the square, row by row.
+    """
+    standard = ALPHABETS[size]
+    keyword = keyword.upper()
+    if size == 5:
+        keyword = keyword.replace('J', 'I')
+    return ''.join(dict.fromkeys(c for c in keyword + standard if c in standard))
+
+
+@lru_cache(maxsize=None)
+def square_tables(alphabet):
+    """
+    Builds the encode and decode tables of a square once per alphabet.
+
+    Args:
+        alphabet (str): The square, row by row (25 or 36 characters).
+
+    Returns:
+        tuple: (encode_table, decode_lookup, size) where encode_table is a
+            str.translate table mapping each letter to "RC " and each space to
+            "/ " (everything else is dropped), and decode_lookup is a uint8
+            array of the cell characters followed by UNKNOWN.
+    """
+    size = 5 if len(alphabet) == 25 else 6
+    encode = {}
+    for cell, char in enumerate(alphabet):
+        pair = f"{cell // size + 1}{cell % size + 1} "
+        encode[char] = pair
+        encode[char.lower()] = pair
+    if size == 5:
+        encode['J'] = encode['j'] = encode['I']
+    encode[' '] = "/ "
+    # Delete everything without a cell, like the original per-character loop
+    dropped = {c: None for c in map(chr, range(128)) if c not in encode}
+    encode_table = str.maketrans({**dropped, **encode})
+    decode_lookup = np.frombuffer((alphabet + UNKNOWN).encode(), dtype=np.uint8)
+    return encode_table, decode_lookup, size
+
+
+def polybius_encode(plaintext, alphabet=ALPHABETS[5]):
+    """
+    Encrypts a message into space-separated coordinate pairs.
+
+    Args:
+        plaintext (str): The message to encrypt.
+        alphabet (str): The square, row by row.
+
+    Returns:
+        str: The coordinate pairs, with '/' between words.
+    """
+    encode_table, _, _ = square_tables(alphabet)
+    # Non-ASCII characters have no cell either; drop them before translating
+    return plaintext.encode('ascii', errors='ignore').decode('ascii').translate(encode_table).strip()
+
+
+def cipher_cells(ciphertext, size=5):
+    """
+    Converts the digits of a ciphertext to cell indices.
+
+    Args:
+        ciphertext (str): Coordinate pairs; anything but digits is ignored.
+        size (int): 5 or 6.
+
+    Returns:
+        np.ndarray: int64 cell index of every pair, or size*size for a pair
+            that falls outside the square.
+
+    Raises:
+        ValueError: If the number of digits is odd.
+    """
+    digits = ''.join(filter(str.isdigit, ciphertext))
+    if len(digits) % 2 != 0:
+        raise ValueError("The encrypted message must have an even number of digits.")
+    values = np.frombuffer(digits.encode(), dtype=np.uint8).astype(np.int64) - ord('1')
+    rows, columns = values[0::2], values[1::2]
+    valid = (rows >= 0) & (rows < size) & (columns >= 0) & (columns < size)
+    return np.where(valid, rows * size + columns, size * size)
+
+
+def polybius_decode(ciphertext, alphabet=ALPHABETS[5]):
+    """
+    Decrypts coordinate pairs with one array lookup.
+
+    Args:
+        ciphertext (str): Coordinate pairs; anything but digits is ignored.
+        alphabet (str): The square, row by row.
+
+    Returns:
+        str: The plaintext, with UNKNOWN for pairs outside the square.
+
+    Raises:
+        ValueError: If the number of digits is odd.
+    """
+    _, decode_lookup, size = square_tables(alphabet)
+    return decode_lookup[cipher_cells(ciphertext, size)].tobytes().decode()
+
+
+def solve_square(ciphertext, size=5, restarts=None, processes=None, seed=0):
+    """
+    Recovers a keyword-mixed square from the ciphertext alone.
+
+    Args:
+        ciphertext (str): Coordinate pairs.
+        size (int): 5 or 6.
+        restarts (int): Hill-climbing restarts (default: the solver's).
+        processes (int): Pool size (None = number of CPUs, 1 = no pool).
+        seed (int): Base seed for reproducible runs.
+
+    Returns:
+        tuple: (score, alphabet, plaintext) with the log10 probability per
+            quadgram and the recovered square, row by row.
+    """
+    from substitution_solver import DEFAULT_RESTARTS, solve_symbols
+    cells = cipher_cells(ciphertext, size)
+    cells = cells[cells < size * size]
+    score, alphabet = solve_symbols(cells, ALPHABETS[size], restarts or DEFAULT_RESTARTS,
+                                    processes, seed)
+    return score, alphabet, polybius_decode(ciphertext, alphabet)
+
+
+def format_square(alphabet):
+    """Returns the square as a printable grid with coordinates."""
+    size = 5 if len(alphabet) == 25 else 6
+    lines = ["   " + "  ".join(str(c + 1) for c in range(size))]
+    for row in range(size):
+        lines.append(f"{row + 1} " + "".join(f" {c} " for c in alphabet[row * size:(row + 1) * size]))
+    return "\n".join(lines)
+
+
+def cli_main(argv, description, decrypt=False):
+    """
+    Command-line entry point of the Polybius tools.
+
+    Args:
+        argv (list): Command-line arguments (without the program name).
+        description (str): Help text shown by --help.
+        decrypt (bool): Decrypt instead of encrypt.
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('-k', '--keyword', default='', help="Keyword of a mixed square (default: standard square)")
+    parser.add_argument('--size', type=int, choices=(5, 6), default=5, help="5x5 (I=J) or 6x6 with digits")
+    if decrypt:
+        parser.add_argument('--solve', action='store_true',
+                            help="Recover an unknown keyed square by quadgram hill climbing")
+        parser.add_argument('--processes', type=int, default=None, help="Worker processes for --solve")
+    parser.add_argument('-i', '--input', default='-', help="Input file ('-' for stdin)")
+    parser.add_argument('-o', '--output', default='-', help="Output file ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    if args.input == '-':
+        text = sys.stdin.read()
+    else:
+        with open(args.input) as f:
+            text = f.read()
+
+    alphabet = keyed_alphabet(args.keyword, args.size)
+    try:
+        if decrypt and args.solve:
+            score, alphabet, result = solve_square(text, args.size, processes=args.processes)
+            print(f"Recovered square (score {score:.3f} per quadgram):", file=sys.stderr)
+            print(format_square(alphabet), file=sys.stderr)
+        elif decrypt:
+            result = polybius_decode(text, alphabet)
+        else:
+            result = polybius_encode(text, alphabet)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.output == '-':
+        print(result)
+    else:
+        with open(args.output, 'w') as f:
+            f.write(result + '\n')
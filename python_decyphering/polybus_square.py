@@ -1,56 +1,42 @@
+import sys
+
+from polybius_core import ALPHABETS, cli_main, keyed_alphabet, polybius_decode
+
 def create_polybius_square():
     """Creates the standard 5x5 Polybius Square."""
-    square = {}
-    alphabet = "ABCDEFGHIKLMNOPQRSTUVWXYZ"  # I/J are combined
-    k = 0
-    for i in range(1, 6):
-        for j in range(1, 6):
-            # Map the coordinate pair (e.g., "11") to a letter
-            square[f"{i}{j}"] = alphabet[k]
-            k += 1
-    return square
+    alphabet = ALPHABETS[5]  # I/J are combined
+    # Map each coordinate pair (e.g., "11") to a letter
+    return {f"{k // 5 + 1}{k % 5 + 1}": char for k, char in enumerate(alphabet)}
 
-def polybius_decrypt(ciphertext):
+def polybius_decrypt(ciphertext, keyword=''):
     """
     Decrypts a message encrypted with the Polybius Square cipher.
 
     Args:
         ciphertext (str): The encrypted message (a string of digits).
+        keyword (str): Keyword of a mixed square (empty for the standard one).
 
     Returns:
         str: The decrypted plaintext.
     """
-    square = create_polybius_square()
-    decrypted_message = ""
-    
-    # Clean the input to only have digits
-    cleaned_text = "".join(filter(str.isdigit, ciphertext))
-    
-    if len(cleaned_text) % 2 != 0:
+    try:
+        # Unknown pairs come back as a '?' placeholder
+        return polybius_decode(ciphertext, keyed_alphabet(keyword))
+    except ValueError:
         return "Error: The encrypted message must have an even number of digits."
 
-    i = 0
-    while i < len(cleaned_text):
-        # Read two digits at a time
-        coord_pair = cleaned_text[i:i+2]
-        
-        # Look up the letter in the square
-        if coord_pair in square:
-            decrypted_message += square[coord_pair]
-        else:
-            # Add a placeholder for unknown pairs
-            decrypted_message += "?"
-            
-        i += 2
-        
-    return decrypted_message
-
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        # python polybus_square.py [-k KEYWORD] [--size 6] [--solve] [-i FILE] [-o FILE]
+        cli_main(sys.argv[1:], "Decrypt Polybius coordinate pairs, or recover an unknown keyed square.", decrypt=True)
+        sys.exit(0)
+
     print("--- Polybius Square Decrypter ---")
-    print("Note: This assumes a standard 5x5 grid where I and J are merged.")
+    print("Note: This assumes a 5x5 grid where I and J are merged.")
     encrypted_message = input("Enter the encrypted message (pairs of numbers from 1-5): ")
+    keyword = input("Enter the square's keyword (leave blank for the standard square): ")
     
-    decrypted_message = polybius_decrypt(encrypted_message)
+    decrypted_message = polybius_decrypt(encrypted_message, keyword)
     
     print("\nDecrypted message:")
     print(decrypted_message)
@@ -1,3 +1,7 @@
+import sys
+
+from caesar_core import BYTE_SHIFT_TABLES, caesar_shift, translate_main
+
 def rot13(text):
     """
     Applies the ROT13 substitution cipher to a given text.
@@ -10,20 +14,14 @@ def rot13(text):
     Returns:
         str: The text after applying ROT13.
     """
-    result = ""
-    for char in text:
-        if 'a' <= char <= 'z':
-            # Rotate lowercase letters
-            result += chr((ord(char) - ord('a') + 13) % 26 + ord('a'))
-        elif 'A' <= char <= 'Z':
-            # Rotate uppercase letters
-            result += chr((ord(char) - ord('A') + 13) % 26 + ord('A'))
-        else:
-            # Keep non-alphabetic characters unchanged
-            result += char
-    return result
+    return caesar_shift(text, 13)
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        # Streaming mode: python rot13.py -i FILE [-o FILE] ('-' for stdin/stdout)
+        translate_main(sys.argv[1:], "Apply ROT13 to a file or stdin in fixed-size chunks.", BYTE_SHIFT_TABLES[13])
+        sys.exit(0)
+
     print("--- ROT13 Cipher Decrypter ---")
     message = input("Enter the message to apply ROT13 to: ")
     processed_message = rot13(message)
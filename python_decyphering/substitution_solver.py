@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Automatic Monoalphabetic Substitution Solver
+Breaks a simple substitution cipher by random-restart hill climbing over the
+key, scored with English quadgram log-probabilities from ngram_scorer.
+
+The ciphertext is reduced once to its distinct quadgrams and how often each
+occurs, as integer arrays of cipher symbols. A key is a small array mapping
+each cipher symbol to a plaintext letter, so trying a swap only remaps two
+entries of that array. Only the distinct quadgrams that contain one of the
+two swapped symbols change, so the score is updated by their difference,
+found through a per-symbol index; the text is never decrypted during the
+search. Restarts are independent and run across a process pool.
+"""
+
+import argparse
+import random
+import string
+import sys
+from functools import lru_cache, partial
+from multiprocessing import Pool
+
+import numpy as np
+
+from ngram_scorer import LETTER_INDEX, SCALE, get_scorer, text_to_indices
+
+# Independent climbs from random keys; the best one wins
+DEFAULT_RESTARTS = 20
+
+# A climb stops after this many swaps in a row failed to improve the score
+MAX_STALE = 2000
+
+# Plaintext symbols that are not letters (e.g. the digits of a 6x6 Polybius
+# square) share this index and score the floor of the quadgram table
+OTHER_INDEX = 26
+
+
+def quadgram_counts(symbols, n_symbols=26):
+    """
+    Reduces a ciphertext to its distinct quadgrams and their counts.
+
+    Args:
+        symbols (np.ndarray): Cipher symbol indices (0 to n_symbols - 1).
+        n_symbols (int): Size of the cipher alphabet.
+
+    Returns:
+        tuple: (columns, counts) where columns is a (4, U) int64 array of the
+            symbols of each distinct quadgram and counts is an int64 array of
+            how often each one occurs.
+    """
+    symbols = np.asarray(symbols, dtype=np.int64)
+    if len(symbols) < 4:
+        return np.zeros((4, 0), dtype=np.int64), np.zeros(0, dtype=np.int64)
+    codes = np.zeros(len(symbols) - 3, dtype=np.int64)
+    for offset in range(4):
+        codes = codes * n_symbols + symbols[offset:len(symbols) - 3 + offset]
+    unique, counts = np.unique(codes, return_counts=True)
+    columns = np.stack([unique // n_symbols ** (3 - i) % n_symbols for i in range(4)])
+    return columns, counts.astype(np.int64)
+
+
+def symbol_index(columns, n_symbols, base=26):
+    """
+    Indexes the distinct quadgrams by the cipher symbols they contain.
+
+    Args:
+        columns (np.ndarray): Distinct cipher quadgrams from quadgram_counts.
+        n_symbols (int): Size of the cipher alphabet.
+        base (int): Size of the plaintext letter index range.
+
+    Returns:
+        tuple: (members, weights) where members[s] holds the indices of the
+            quadgrams that contain symbol s, and weights[s, q] is what symbol
+            s adds to the table index of quadgram q per unit of its letter
+            (base ** 3 in first position, ..., 1 in last).
+    """
+    weights = np.zeros((n_symbols, columns.shape[1]), dtype=np.int64)
+    positions = np.arange(columns.shape[1])
+    for offset, row in enumerate(columns):
+        weights[row, positions] += base ** (3 - offset)
+    return [np.flatnonzero(row) for row in weights], weights
+
+
+def quadgram_codes(letters, columns, base=26):
+    """Returns the table index of each quadgram decrypted through `letters`."""
+    return ((letters[columns[0]] * base + letters[columns[1]]) * base + letters[columns[2]]) * base + letters[columns[3]]
+
+
+@lru_cache(maxsize=None)
+def quadgram_log_probs(base=26):
+    """
+    Returns the quadgram log10 probabilities, scaled by SCALE as in the
+    shipped int16 table, indexed in the given base.
+
+    With base 26 this is the shared memory-mapped table itself. With base 27
+    the extra index OTHER_INDEX stands for any non-letter, and every quadgram
+    containing it gets the lowest log probability of the table.
+
+    Args:
+        base (int): 26 for letters only, 27 with OTHER_INDEX.
+
+    Returns:
+        np.ndarray: base^4 scaled int16 log10 probabilities.
+    """
+    log_probs = get_scorer(4).table
+    if base == 26:
+        return log_probs
+    extended = np.full((base,) * 4, log_probs.min())
+    extended[:26, :26, :26, :26] = log_probs.reshape((26,) * 4)
+    return extended.ravel()
+
+
+def score_key(letters, columns, counts, log_probs, base=26):
+    """
+    Scores a key against the ciphertext quadgram table.
+
+    Args:
+        letters (np.ndarray): Plaintext letter index of each cipher symbol.
+        columns (np.ndarray): Distinct cipher quadgrams from quadgram_counts.
+        counts (np.ndarray): How often each quadgram occurs.
+        log_probs (np.ndarray): base^4 scaled quadgram log10 probabilities.
+        base (int): Size of the plaintext letter index range.
+
+    Returns:
+        float: Sum of log10 probabilities of the decrypted quadgrams.
+    """
+    return int(counts @ log_probs[quadgram_codes(letters, columns, base)]) / SCALE
+
+
+def hill_climb(columns, counts, alphabet_index, seed, max_stale=MAX_STALE):
+    """
+    Climbs from one random key by swapping two plaintext letters at a time
+    and keeping the swap whenever the score improves. A swap is scored by
+    the change of the quadgrams that contain either symbol only.
+
+    Args:
+        columns (np.ndarray): Distinct cipher quadgrams from quadgram_counts.
+        counts (np.ndarray): How often each quadgram occurs.
+        alphabet_index (np.ndarray): Letter index (0-25, or OTHER_INDEX) of
+            each plaintext alphabet entry; the key is a permutation of its
+            positions.
+        seed (int): Seed of this restart.
+        max_stale (int): Failed swaps in a row before giving up.
+
+    Returns:
+        tuple: (score, key) where key[s] is the plaintext alphabet position
+            of cipher symbol s.
+    """
+    base = 27 if alphabet_index.max() == OTHER_INDEX else 26
+    log_probs = quadgram_log_probs(base)
+    rng = random.Random(seed)
+    size = len(alphabet_index)
+    members, weights = symbol_index(columns, size, base)
+    key = np.array(rng.sample(range(size), size))
+    letters = alphabet_index[key]
+    codes = quadgram_codes(letters, columns, base)
+    # Scaled integer score, so the deltas add up exactly
+    score = int(counts @ log_probs[codes])
+    stale = 0
+    while stale < max_stale:
+        a, b = rng.sample(range(size), 2)
+        # Quadgrams with symbol a, plus those with b but not a
+        affected = members[b]
+        affected = np.concatenate((members[a], affected[weights[a, affected] == 0]))
+        old_codes = codes[affected]
+        new_codes = old_codes + (letters[b] - letters[a]) * (weights[a, affected] - weights[b, affected])
+        delta = int(counts[affected] @ (log_probs[new_codes].astype(np.int64) - log_probs[old_codes]))
+        if delta > 0:
+            key[a], key[b] = key[b], key[a]
+            letters[a], letters[b] = letters[b], letters[a]
+            codes[affected] = new_codes
+            score += delta
+            stale = 0
+        else:
+            stale += 1
+    return score / SCALE, key
+
+
+def solve_symbols(symbols, alphabet=string.ascii_uppercase, restarts=DEFAULT_RESTARTS,
+                  processes=None, seed=0, max_stale=MAX_STALE):
+    """
+    Finds the substitution key of a sequence of cipher symbols.
+
+    Args:
+        symbols (np.ndarray): Cipher symbol indices (0 to len(alphabet) - 1).
+        alphabet (str): The plaintext alphabet the symbols stand for.
+        restarts (int): Number of independent climbs.
+        processes (int): Pool size (None = number of CPUs, 1 = no pool).
+        seed (int): Base seed; restart i uses seed + i.
+        max_stale (int): Failed swaps in a row before a climb gives up.
+
+    Returns:
+        tuple: (score, key) where score is the log10 probability per quadgram
+            and key[s] is the plaintext letter of cipher symbol s.
+    """
+    columns, counts = quadgram_counts(symbols, len(alphabet))
+    if counts.sum() == 0:
+        return float('-inf'), alphabet
+    alphabet_index = LETTER_INDEX[np.frombuffer(alphabet.encode(), dtype=np.uint8)].astype(np.int64)
+    alphabet_index[alphabet_index == 255] = OTHER_INDEX
+    climb = partial(hill_climb, columns, counts, alphabet_index, max_stale=max_stale)
+    seeds = range(seed, seed + restarts)
+    if processes == 1:
+        results = list(map(climb, seeds))
+    else:
+        with Pool(processes) as pool:
+            results = pool.map(climb, seeds)
+    score, key = max(results, key=lambda r: r[0])
+    return score / counts.sum(), ''.join(alphabet[k] for k in key)
+
+
+def solve_substitution(ciphertext, restarts=DEFAULT_RESTARTS, processes=None, seed=0):
+    """
+    Solves a monoalphabetic substitution over A-Z.
+
+    Args:
+        ciphertext (str): The encrypted message; non-letters are ignored.
+        restarts (int): Number of independent climbs.
+        processes (int): Pool size (None = number of CPUs, 1 = no pool).
+        seed (int): Base seed for reproducible runs.
+
+    Returns:
+        tuple: (score, decryption_map) with the log10 probability per quadgram
+            and a map from ciphertext letters to plaintext letters.
+    """
+    score, key = solve_symbols(text_to_indices(ciphertext), restarts=restarts,
+                               processes=processes, seed=seed)
+    return score, dict(zip(string.ascii_uppercase, key))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Break a simple substitution cipher with quadgram hill climbing.")
+    parser.add_argument('input', nargs='?', default='-', help="Ciphertext file ('-' for stdin)")
+    parser.add_argument('--restarts', type=int, default=DEFAULT_RESTARTS,
+                        help=f"Independent climbs (default {DEFAULT_RESTARTS})")
+    parser.add_argument('--processes', type=int, default=None, help="Worker processes (default: all CPUs)")
+    parser.add_argument('--seed', type=int, default=0, help="Base random seed")
+    args = parser.parse_args(argv)
+
+    if args.input == '-':
+        ciphertext = sys.stdin.read()
+    else:
+        with open(args.input, encoding='utf-8', errors='replace') as f:
+            ciphertext = f.read()
+
+    score, decryption_map = solve_substitution(ciphertext, args.restarts, args.processes, args.seed)
+    cipher_letters = ''.join(decryption_map)
+    plain_letters = ''.join(decryption_map.values())
+    table = str.maketrans(cipher_letters + cipher_letters.lower(), plain_letters + plain_letters.lower())
+    print(f"Score: {score:.3f} per quadgram", file=sys.stderr)
+    print(f"Cipher: {cipher_letters}", file=sys.stderr)
+    print(f"Plain:  {plain_letters}", file=sys.stderr)
+    sys.stdout.write(ciphertext.translate(table))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,339 @@
+"""
+Shared Vigenère engine used by the Vigenère encrypter and decrypter.
+
+The text is viewed as a uint8 array. The letters are picked out with a mask,
+shifted by the tiled key in one NumPy operation mod 26, and written back,
+while everything else stays in place. As in the classic scripts, the key only
+advances on letters.
+
+The key length is estimated from the index of coincidence of the columns for
+every candidate length, combined with Kasiski spacings of repeated trigrams.
+For a given length, every column is solved at once: the (key_len x 26) column
+histograms are multiplied by a 26 x 26 matrix of rotated English
+log-frequencies, which scores all 26 shifts of all columns in one product.
+"""
+
+import argparse
+import sys
+
+import numpy as np
+
+from caesar_core import ENGLISH_FREQUENCIES, LOG_FREQUENCIES
+from key_length_core import drop_overfit_multiples
+from ngram_scorer import ngram_indices, text_to_indices
+from xor_core import DEFAULT_CHUNK_SIZE, add_stream_arguments, open_streams
+
+# Index of coincidence of English and of uniformly random letters
+ENGLISH_IOC = sum(f * f for f in ENGLISH_FREQUENCIES) / sum(ENGLISH_FREQUENCIES) ** 2
+RANDOM_IOC = 1 / 26
+
+# SHIFT_MATRIX[c, k] is the English log-frequency of the letter that
+# ciphertext letter c decrypts to under key letter k, so a column histogram
+# times this matrix is the circular cross-correlation with English
+SHIFT_MATRIX = np.array([[LOG_FREQUENCIES[(c - k) % 26] for k in range(26)] for c in range(26)])
+
+# Longest key length tried by default
+DEFAULT_MAX_KEY_LENGTH = 40
+
+# Fewest letters per column for a key length to be tried; shorter columns
+# give an IoC that is mostly noise
+MIN_COLUMN_LETTERS = 8
+
+# Letters binned per step when building the column histograms, bounding the
+# temporary index array to HISTOGRAM_BLOCK * max_key_length entries
+HISTOGRAM_BLOCK = 1 << 16
+
+# Only the first letters are used for Kasiski; repeats are plentiful by then
+KASISKI_SAMPLE = 20000
+
+# Share of a multiple's IoC + Kasiski score a key length needs to be kept
+# over it; the combined score is noisy, so the margin is wide
+IOC_DIVISOR_TOLERANCE = 0.85
+
+
+def key_shifts(key):
+    """
+    Converts a keyword to its shifts (A/a=0 ... Z/z=25).
+
+    Args:
+        key (str): The keyword.
+
+    Returns:
+        np.ndarray: int16 array of shifts, one per key letter.
+    """
+    shifts = np.frombuffer(key.upper().encode('utf-8'), dtype=np.uint8).astype(np.int16)
+    return (shifts - ord('A')) % 26
+
+
+def letter_mask(buffer):
+    """
+    Splits a byte buffer into letter positions.
+
+    Args:
+        buffer (np.ndarray): uint8 view of the text.
+
+    Returns:
+        tuple: (letters, lower) boolean masks for ASCII letters and for
+            the lowercase ones among them.
+    """
+    upper = (buffer >= ord('A')) & (buffer <= ord('Z'))
+    lower = (buffer >= ord('a')) & (buffer <= ord('z'))
+    return upper | lower, lower
+
+
+def vigenere_bytes(data, key, decrypt=False, phase=0):
+    """
+    Applies the Vigenère cipher to raw bytes.
+
+    Args:
+        data (bytes): ASCII or UTF-8 text; only A-Z and a-z are changed.
+        key (str or np.ndarray): The keyword, or its key_shifts.
+        decrypt (bool): Shift backwards instead of forwards.
+        phase (int): Key position that lines up with the first letter.
+
+    Returns:
+        tuple: (result bytes, phase for the letter after the last one)
+    """
+    shifts = key_shifts(key) if isinstance(key, str) else key
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    letters, lower = letter_mask(buffer)
+    count = int(np.count_nonzero(letters))
+    if count == 0 or len(shifts) == 0:
+        return bytes(data), phase
+
+    tiled = np.resize(np.roll(shifts, -(phase % len(shifts))), count)
+    if decrypt:
+        tiled = -tiled
+    base = np.where(lower[letters], ord('a'), ord('A')).astype(np.int16)
+    result = buffer.copy()
+    result[letters] = (buffer[letters] - base + tiled) % 26 + base
+    return result.tobytes(), (phase + count) % len(shifts)
+
+
+def vigenere_text(text, key, decrypt=False):
+    """
+    Applies the Vigenère cipher to a string.
+
+    Args:
+        text (str): The message.
+        key (str): The keyword.
+        decrypt (bool): Shift backwards instead of forwards.
+
+    Returns:
+        str: The encrypted or decrypted message.
+    """
+    data = text.encode('utf-8', errors='surrogatepass')
+    result, _ = vigenere_bytes(data, key, decrypt)
+    return result.decode('utf-8', errors='surrogatepass')
+
+
+def vigenere_stream(in_stream, out_stream, key, decrypt=False, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Applies the Vigenère cipher to a whole binary stream in fixed-size chunks,
+    carrying the key position across chunk boundaries.
+
+    Args:
+        in_stream: Binary file object to read from.
+        out_stream: Binary file object to write to.
+        key (str): The keyword.
+        decrypt (bool): Shift backwards instead of forwards.
+        chunk_size (int): Number of bytes processed per step.
+
+    Returns:
+        int: The number of bytes processed.
+    """
+    shifts = key_shifts(key)
+    phase = 0
+    total = 0
+    while True:
+        chunk = in_stream.read(chunk_size)
+        if not chunk:
+            return total
+        result, phase = vigenere_bytes(chunk, shifts, decrypt, phase)
+        out_stream.write(result)
+        total += len(chunk)
+
+
+def column_histograms(letters, key_length):
+    """
+    Counts the letters of each key column.
+
+    Args:
+        letters (np.ndarray): Letter indices (0-25).
+        key_length (int): The key length.
+
+    Returns:
+        np.ndarray: (key_length, 26) counts.
+    """
+    phases = np.arange(len(letters)) % key_length
+    index = phases * 26 + letters
+    return np.bincount(index, minlength=key_length * 26).reshape(key_length, 26)
+
+
+def solve_key(text, key_length):
+    """
+    Finds the most likely key of a given length, one Caesar shift per column.
+
+    Args:
+        text (str or bytes): The ciphertext.
+        key_length (int): The key length.
+
+    Returns:
+        tuple: (key, scores) where scores holds the per-letter English
+            log-likelihood of each column under its chosen shift.
+    """
+    histograms = column_histograms(text_to_indices(text), key_length)
+    # (key_length, 26) log-likelihoods of every shift of every column
+    likelihoods = histograms @ SHIFT_MATRIX
+    shifts = likelihoods.argmax(axis=1)
+    sizes = np.maximum(histograms.sum(axis=1), 1)
+    key = ''.join(chr(ord('A') + int(shift)) for shift in shifts)
+    return key, likelihoods[np.arange(key_length), shifts] / sizes
+
+
+def periodic_histograms(letters, max_key_length):
+    """
+    Counts the letters of every column for every key length 1..max_key_length
+    in one pass over the text.
+
+    Each letter is binned once per candidate length into a single flat
+    histogram, so the text is read once regardless of how many lengths are
+    tried.
+
+    Args:
+        letters (np.ndarray): Letter indices (0-25).
+        max_key_length (int): Longest key length.
+
+    Returns:
+        np.ndarray: (max_key_length * (max_key_length + 1) / 2, 26) counts.
+            The columns of length L are rows L*(L-1)/2 to L*(L+1)/2.
+    """
+    lengths = np.arange(1, max_key_length + 1)
+    offsets = 26 * (lengths * (lengths - 1) // 2)
+    bins = 26 * max_key_length * (max_key_length + 1) // 2
+    counts = np.zeros(bins, dtype=np.int64)
+    for start in range(0, len(letters), HISTOGRAM_BLOCK):
+        block = letters[start:start + HISTOGRAM_BLOCK].astype(np.int64)
+        positions = np.arange(start, start + len(block))
+        index = offsets[:, None] + (positions % lengths[:, None]) * 26 + block
+        counts += np.bincount(index.ravel(), minlength=bins)
+    return counts.reshape(-1, 26)
+
+
+def ioc_by_length(letters, max_key_length):
+    """
+    Average column index of coincidence for every key length.
+
+    Args:
+        letters (np.ndarray): Letter indices (0-25).
+        max_key_length (int): Longest key length.
+
+    Returns:
+        np.ndarray: max_key_length IoC values, indexed by length - 1.
+    """
+    columns = periodic_histograms(letters, max_key_length)
+    sizes = columns.sum(axis=1)
+    coincidences = (columns * (columns - 1)).sum(axis=1)
+    column_ioc = coincidences / np.maximum(sizes * (sizes - 1), 1)
+    lengths = np.arange(1, max_key_length + 1)
+    return np.add.reduceat(column_ioc, lengths * (lengths - 1) // 2) / lengths
+
+
+def kasiski_by_length(letters, max_key_length, sample=KASISKI_SAMPLE):
+    """
+    Kasiski evidence for every key length: how much more often than chance
+    the spacings between repeated trigrams are multiples of the length.
+
+    Args:
+        letters (np.ndarray): Letter indices (0-25).
+        max_key_length (int): Longest key length.
+        sample (int): Number of leading letters searched for repeats.
+
+    Returns:
+        np.ndarray: max_key_length values, 0 for chance and 1 when every
+            spacing divides.
+    """
+    lengths = np.arange(1, max_key_length + 1)
+    trigrams = ngram_indices(letters[:sample], 3)
+    # Sorting groups equal trigrams; consecutive equal entries are repeats
+    order = np.argsort(trigrams, kind='stable')
+    repeated = trigrams[order[1:]] == trigrams[order[:-1]]
+    spacings = (order[1:] - order[:-1])[repeated]
+    if len(spacings) == 0:
+        return np.zeros(max_key_length)
+    divides = (spacings % lengths[:, None] == 0).mean(axis=1)
+    chance = 1 / lengths
+    evidence = np.zeros(max_key_length)
+    evidence[1:] = (divides[1:] - chance[1:]) / (1 - chance[1:])
+    # Length 1 divides every spacing, so it is as supported as the best length
+    evidence[0] = max(0.0, evidence.max())
+    return evidence
+
+
+def key_length_limit(letter_count, max_key_length=DEFAULT_MAX_KEY_LENGTH):
+    """
+    Returns the longest key length worth testing for a text, so that every
+    column keeps at least MIN_COLUMN_LETTERS letters.
+
+    Args:
+        letter_count (int): Number of letters in the text.
+        max_key_length (int): Upper bound regardless of the text length.
+
+    Returns:
+        int: At least 1.
+    """
+    return max(1, min(max_key_length, letter_count // MIN_COLUMN_LETTERS))
+
+
+def estimate_key_lengths(text, max_key_length=DEFAULT_MAX_KEY_LENGTH, top=5):
+    """
+    Ranks Vigenère key lengths by IoC and Kasiski evidence.
+
+    The column IoC is normalised to 0 for random text and 1 for English and
+    added to the Kasiski score. The IoC cannot tell the key length from its
+    multiples and Kasiski cannot tell it from its divisors, so the sum peaks
+    at the true length. A length is dropped when one of its divisors scores
+    almost as well.
+
+    Args:
+        text (str or bytes): The ciphertext.
+        max_key_length (int): Longest key length tried; shorter texts are
+            capped further by key_length_limit.
+        top (int): Number of lengths returned.
+
+    Returns:
+        list: (length, score, ioc, kasiski) tuples, best first.
+    """
+    letters = text_to_indices(text)
+    if len(letters) < 2:
+        return []
+    max_key_length = key_length_limit(len(letters), max_key_length)
+    ioc = ioc_by_length(letters, max_key_length)
+    kasiski = kasiski_by_length(letters, max_key_length)
+    scores = (ioc - RANDOM_IOC) / (ENGLISH_IOC - RANDOM_IOC) + kasiski
+    results = [(length, float(scores[length - 1]), float(ioc[length - 1]), float(kasiski[length - 1]))
+               for length in range(1, max_key_length + 1)]
+    results = drop_overfit_multiples(results, lambda r: r[0], lambda r: r[1], IOC_DIVISOR_TOLERANCE)
+    results.sort(key=lambda r: r[1], reverse=True)
+    return results[:top]
+
+
+def stream_main(argv, description, decrypt=False):
+    """
+    Command-line entry point for the streaming mode of the Vigenère tools.
+
+    Args:
+        argv (list): Command-line arguments (without the program name).
+        description (str): Help text shown by --help.
+        decrypt (bool): Decrypt instead of encrypt.
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('-k', '--key', required=True, help="The keyword (letters only)")
+    add_stream_arguments(parser)
+    args = parser.parse_args(argv)
+    if not args.key.isalpha():
+        parser.error("The key must contain letters only.")
+
+    with open_streams(args.input, args.output) as (in_stream, out_stream):
+        total = vigenere_stream(in_stream, out_stream, args.key, decrypt, args.chunk_size)
+    print(f"Processed {total} bytes.", file=sys.stderr)
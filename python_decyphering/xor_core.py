@@ -0,0 +1,306 @@
+"""
+Shared XOR core used by the XOR encrypter, decrypter and key finders.
+
+Instead of XORing one byte at a time in a Python loop, the key is tiled to
+the length of the data and both buffers are XORed at once as big integers
+(`int.from_bytes`), which runs at C speed even for multi-megabyte inputs.
+"""
+
+import argparse
+import binascii
+import sys
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from functools import lru_cache
+
+# Default read size for the streaming mode (1 MiB)
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+HEX_WHITESPACE = b' \t\r\n'
+
+
+@lru_cache(maxsize=256)
+def single_byte_table(key_byte):
+    """
+    Returns a 256-byte translation table that XORs every byte with key_byte.
+
+    Args:
+        key_byte (int): The single byte key (0-255).
+
+    Returns:
+        bytes: A table usable with bytes.translate().
+    """
+    return bytes(b ^ key_byte for b in range(256))
+
+
+def tile_key(key_bytes, length, phase=0):
+    """
+    Repeats the key until it covers `length` bytes.
+
+    Args:
+        key_bytes (bytes): The raw bytes of the key.
+        length (int): The number of bytes to produce.
+        phase (int): Position inside the key to start from.
+
+    Returns:
+        bytes: The tiled key stream.
+    """
+    key_len = len(key_bytes)
+    phase %= key_len
+    if phase:
+        key_bytes = key_bytes[phase:] + key_bytes[:phase]
+    repeats = -(-length // key_len)
+    return (bytes(key_bytes) * repeats)[:length]
+
+
+def xor_bytes(bytes1, bytes2):
+    """
+    XORs two byte strings up to the length of the shorter one.
+
+    Args:
+        bytes1 (bytes): The first buffer.
+        bytes2 (bytes): The second buffer.
+
+    Returns:
+        bytes: The XOR of both buffers.
+    """
+    length = min(len(bytes1), len(bytes2))
+    if length == 0:
+        return b''
+    value1 = int.from_bytes(bytes1[:length], 'big')
+    value2 = int.from_bytes(bytes2[:length], 'big')
+    return (value1 ^ value2).to_bytes(length, 'big')
+
+
+def shifted_xor(data_bytes, shift):
+    """
+    XORs a buffer with a copy of itself shifted by `shift` bytes.
+
+    For a repeating key of length `shift` the key cancels out, so the result
+    only depends on the plaintext: out[i] = plain[i] ^ plain[i + shift].
+
+    Args:
+        data_bytes (bytes): The buffer.
+        shift (int): The shift distance (>= 1).
+
+    Returns:
+        bytes: len(data_bytes) - shift bytes.
+    """
+    return xor_bytes(data_bytes[:-shift], data_bytes[shift:])
+
+
+def repeating_key_xor(data_bytes, key_bytes, phase=0):
+    """
+    Applies a repeating key XOR to a byte string.
+
+    Args:
+        data_bytes (bytes): The raw bytes to encrypt or decrypt.
+        key_bytes (bytes): The raw bytes of the key.
+        phase (int): Position inside the key that lines up with data_bytes[0].
+
+    Returns:
+        bytes: The resulting bytes after XORing.
+    """
+    if not key_bytes:
+        return bytes(data_bytes)
+    if len(key_bytes) == 1:
+        return bytes(data_bytes).translate(single_byte_table(key_bytes[0]))
+    return xor_bytes(data_bytes, tile_key(key_bytes, len(data_bytes), phase))
+
+
+def byte_histogram(data_bytes):
+    """
+    Counts how often each byte value occurs.
+
+    Args:
+        data_bytes (bytes): The buffer to count.
+
+    Returns:
+        list: 256 counts, indexed by byte value.
+    """
+    histogram = [0] * 256
+    for byte, count in Counter(data_bytes).items():
+        histogram[byte] = count
+    return histogram
+
+
+def popcount(data_bytes, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Counts the set bits in a buffer using int.bit_count on large chunks.
+
+    Args:
+        data_bytes (bytes): The buffer.
+        chunk_size (int): Bytes converted to one integer at a time.
+
+    Returns:
+        int: The number of 1 bits.
+    """
+    return sum(int.from_bytes(data_bytes[i:i + chunk_size], 'big').bit_count()
+               for i in range(0, len(data_bytes), chunk_size))
+
+
+def read_chunks(stream, chunk_size=DEFAULT_CHUNK_SIZE, hex_input=False):
+    """
+    Reads a binary stream in fixed-size chunks.
+
+    Args:
+        stream: A binary file object (e.g. sys.stdin.buffer).
+        chunk_size (int): Number of bytes to yield per chunk.
+        hex_input (bool): Treat the stream as hex text and decode it on the fly.
+            Whitespace is ignored and an odd digit is carried to the next chunk.
+
+    Yields:
+        bytes: Raw data chunks.
+    """
+    if not hex_input:
+        while True:
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+    yield from unhex_chunks(iter(lambda: stream.read(chunk_size * 2), b''))
+
+
+def unhex_chunks(chunks):
+    """
+    Decodes a sequence of hex text chunks to raw bytes. Whitespace is ignored
+    and an odd digit is carried to the next chunk.
+
+    Args:
+        chunks: Iterable of hex text chunks (bytes).
+
+    Yields:
+        bytes: The decoded chunks.
+
+    Raises:
+        ValueError: If the input has an odd number of digits or a non-hex
+            character (binascii.Error is a ValueError).
+    """
+    pending = b''
+    for text in chunks:
+        text = pending + text.translate(None, HEX_WHITESPACE)
+        even = len(text) - len(text) % 2
+        pending = text[even:]
+        if even:
+            yield binascii.unhexlify(text[:even])
+    if pending:
+        raise ValueError("Hex input has an odd number of digits.")
+
+
+def xor_stream(chunks, key_bytes, phase=0):
+    """
+    XORs a sequence of chunks with a repeating key, keeping the key phase
+    aligned across chunk boundaries.
+
+    Args:
+        chunks: Iterable of byte chunks.
+        key_bytes (bytes): The raw bytes of the key.
+        phase (int): Position inside the key that lines up with the first byte.
+
+    Yields:
+        bytes: The XORed chunks.
+    """
+    for chunk in chunks:
+        yield repeating_key_xor(chunk, key_bytes, phase)
+        phase = (phase + len(chunk)) % len(key_bytes)
+
+
+def xor_file(in_stream, out_stream, key_bytes, chunk_size=DEFAULT_CHUNK_SIZE,
+             hex_input=False, hex_output=False):
+    """
+    XORs a whole stream with a repeating key using constant memory.
+
+    Args:
+        in_stream: Binary file object to read from.
+        out_stream: Binary file object to write to.
+        key_bytes (bytes): The raw bytes of the key.
+        chunk_size (int): Number of bytes processed per step.
+        hex_input (bool): The input is hex text instead of raw bytes.
+        hex_output (bool): Write hex text instead of raw bytes.
+
+    Returns:
+        int: The number of bytes processed.
+    """
+    total = 0
+    for chunk in xor_stream(read_chunks(in_stream, chunk_size, hex_input), key_bytes):
+        out_stream.write(binascii.hexlify(chunk) if hex_output else chunk)
+        total += len(chunk)
+    if hex_output:
+        out_stream.write(b'\n')
+    return total
+
+
+def add_stream_arguments(parser, chunk_unit='Bytes'):
+    """
+    Adds the -i/-o options shared by the streaming tools, and --chunk-size.
+
+    Args:
+        parser (argparse.ArgumentParser): The parser to extend.
+        chunk_unit (str): What a chunk is counted in, for the help text; None
+            leaves out --chunk-size.
+    """
+    parser.add_argument('-i', '--input', default='-', help="Input file ('-' for stdin)")
+    parser.add_argument('-o', '--output', default='-', help="Output file ('-' for stdout)")
+    if chunk_unit is not None:
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                            help=f"{chunk_unit} per chunk (default {DEFAULT_CHUNK_SIZE})")
+
+
+@contextmanager
+def open_streams(input_path, output_path, binary=True):
+    """
+    Opens the input and output of a streaming tool; '-' means stdin/stdout.
+    Files opened here are closed on exit, the standard streams are left open.
+
+    Args:
+        input_path (str): Input file or '-'.
+        output_path (str): Output file or '-'.
+        binary (bool): Open binary streams (sys.stdin.buffer etc.) instead of text.
+
+    Yields:
+        tuple: (in_stream, out_stream)
+    """
+    with ExitStack() as stack:
+        if input_path == '-':
+            in_stream = sys.stdin.buffer if binary else sys.stdin
+        else:
+            in_stream = stack.enter_context(open(input_path, 'rb' if binary else 'r'))
+        if output_path == '-':
+            out_stream = sys.stdout.buffer if binary else sys.stdout
+        else:
+            out_stream = stack.enter_context(open(output_path, 'wb' if binary else 'w'))
+        yield in_stream, out_stream
+
+
+def stream_main(argv, description):
+    """
+    Command-line entry point for the streaming mode of the XOR tools.
+
+    Args:
+        argv (list): Command-line arguments (without the program name).
+        description (str): Help text shown by --help.
+    """
+    parser = argparse.ArgumentParser(description=description)
+    key_group = parser.add_mutually_exclusive_group(required=True)
+    key_group.add_argument('-k', '--key', help="Key as a string")
+    key_group.add_argument('--key-hex', help="Key as a hex string")
+    add_stream_arguments(parser)
+    parser.add_argument('--hex-in', action='store_true', help="Input is hex text")
+    parser.add_argument('--hex-out', action='store_true', help="Write hex instead of raw bytes")
+    args = parser.parse_args(argv)
+
+    try:
+        key_bytes = args.key.encode('utf-8') if args.key is not None else bytes.fromhex(args.key_hex)
+    except ValueError:
+        parser.error("Invalid hex key.")
+    if not key_bytes:
+        parser.error("Key cannot be empty.")
+
+    with open_streams(args.input, args.output) as (in_stream, out_stream):
+        try:
+            total = xor_file(in_stream, out_stream, key_bytes, args.chunk_size,
+                             args.hex_in, args.hex_out)
+        except (binascii.Error, ValueError) as e:
+            parser.error(f"Invalid hex input: {e}")
+    print(f"Processed {total} bytes.", file=sys.stderr)
@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+"""
+Multi-Crib Known-Plaintext Search for Repeating-Key XOR
+Checks a set of cribs (flag prefixes, file headers, ...) against every key
+length and every placement at once, without assuming the known plaintext sits
+at position 0.
+
+For a key of length L, a crib placed at offset p implies the key bytes
+key[(p + i) % L] = c[p + i] ^ crib[i]. Those implied bytes go into a
+constraint table indexed by (length, phase), and only placements that agree
+with each other are merged into partial keys.
+
+A crib longer than L checks itself: the key cancels in c[i] ^ c[i + L], so
+the crib's own difference pattern is located in the shifted ciphertext with
+one bytes.find scan per (crib, length). Full decrypts are only done for the
+few partial keys that survive.
+"""
+
+import argparse
+import os
+import sys
+
+from key_length_core import drop_overfit_multiples
+from xor_core import repeating_key_xor, shifted_xor, xor_bytes
+from xor_decipher import BYTE_WEIGHTS, single_byte_xor_scores
+
+# Where a crib may sit: at the start, at the end, or anywhere
+ANCHOR_START = 'start'
+ANCHOR_END = 'end'
+ANCHOR_ANY = 'any'
+
+# name -> (crib bytes, anchor)
+DEFAULT_CRIBS = {
+    'crypto{': (b'crypto{', ANCHOR_START),
+    '}': (b'}', ANCHOR_END),
+    'PNG': (b'\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR', ANCHOR_START),
+    'ZIP': (b'PK\x03\x04', ANCHOR_START),
+    'PDF': (b'%PDF-1.', ANCHOR_START),
+}
+
+# Free placements kept per (crib, length); more usually means a low-entropy ciphertext
+MAX_PLACEMENTS = 64
+
+# Partial keys kept per length while merging placements
+MAX_PARTIAL_KEYS = 32
+
+# Bytes that count as readable plaintext
+PRINTABLE = bytes(range(32, 127)) + b'\t\n\r'
+PRINTABLE_WEIGHTS = [1 if b in PRINTABLE else 0 for b in range(256)]
+
+# Pseudo-count of random bytes mixed into evidence_score
+EVIDENCE_PRIOR = 8
+
+# Ranking bonus per key byte two independent placements agreed on
+CONFIRMED_BONUS = 0.25
+
+# Share of a longer partial key's evidence score a shorter one that agrees on
+# every crib byte needs to replace it
+CRIB_DIVISOR_TOLERANCE = 0.95
+
+# A key byte is allowed for a column if it decrypts at least this share to printable text
+MIN_PRINTABLE = 0.95
+
+
+def allowed_key_bytes(cipher_bytes, key_len, min_printable=MIN_PRINTABLE):
+    """
+    Builds the constraint table row for one key length: for every phase, the
+    key bytes that decrypt that column to mostly printable text.
+
+    Args:
+        cipher_bytes (bytes): The ciphertext.
+        key_len (int): The key length.
+        min_printable (float): Share of printable bytes a key byte must produce.
+
+    Returns:
+        list: key_len 256-byte masks, mask[k] == 1 if key byte k is allowed.
+    """
+    row = []
+    for phase in range(key_len):
+        column = cipher_bytes[phase::key_len]
+        threshold = min_printable * len(column)
+        scores = single_byte_xor_scores(column, PRINTABLE_WEIGHTS)
+        row.append(bytes(1 if score >= threshold else 0 for score in scores))
+    return row
+
+
+def crib_placements(cipher_bytes, crib, key_len, anchor=ANCHOR_ANY, diffs=None, allowed=None):
+    """
+    Finds the offsets where a crib is consistent with a key of length key_len.
+
+    An anchored crib is checked at its one offset. A free crib longer than the
+    key checks itself: its difference pattern c[i] ^ c[i + L] is located in
+    the shifted ciphertext with bytes.find. A free crib that fits inside one
+    key period is checked against the allowed key bytes instead: every byte it
+    implies must decrypt its column to printable text. That check runs per
+    crib byte as column translates and one big-integer AND over all offsets.
+
+    Args:
+        cipher_bytes (bytes): The ciphertext.
+        crib (bytes): The known plaintext fragment.
+        key_len (int): The key length under test.
+        anchor (str): ANCHOR_START, ANCHOR_END or ANCHOR_ANY.
+        diffs (bytes): shifted_xor(cipher_bytes, key_len), shared across cribs.
+        allowed (list): allowed_key_bytes(cipher_bytes, key_len); short free
+            cribs are skipped without it.
+
+    Returns:
+        list: Offsets of consistent placements.
+    """
+    crib_len = len(crib)
+    length = len(cipher_bytes)
+    if crib_len == 0 or crib_len > length:
+        return []
+
+    if anchor != ANCHOR_ANY:
+        offset = 0 if anchor == ANCHOR_START else length - crib_len
+        implied = xor_bytes(cipher_bytes[offset:offset + crib_len], crib)
+        return [offset] if implied[:-key_len] == implied[key_len:] else []
+
+    offsets = []
+    if crib_len > key_len:
+        if diffs is None:
+            diffs = shifted_xor(cipher_bytes, key_len)
+        pattern = shifted_xor(crib, key_len)
+        pos = diffs.find(pattern)
+        while pos != -1 and len(offsets) < MAX_PLACEMENTS:
+            offsets.append(pos)
+            pos = diffs.find(pattern, pos + 1)
+        return offsets
+
+    if allowed is None:
+        return []
+    count = length - crib_len + 1
+    hits = -1
+    for i, plain_byte in enumerate(crib):
+        # ok[j] == 1 if placing crib[i] at position j implies an allowed key byte
+        ok = bytearray(length)
+        for phase in range(key_len):
+            table = bytes(allowed[phase][c ^ plain_byte] for c in range(256))
+            ok[phase::key_len] = cipher_bytes[phase::key_len].translate(table)
+        hits &= int.from_bytes(ok[i:i + count], 'big')
+        if not hits:
+            return []
+    hits = hits.to_bytes(count, 'big')
+    pos = hits.find(1)
+    while pos != -1 and len(offsets) < MAX_PLACEMENTS:
+        offsets.append(pos)
+        pos = hits.find(1, pos + 1)
+    return offsets
+
+
+def implied_key_bytes(cipher_bytes, crib, offset, key_len):
+    """
+    Returns the key bytes a placement implies, as a {phase: byte} dict.
+
+    Args:
+        cipher_bytes (bytes): The ciphertext.
+        crib (bytes): The known plaintext fragment.
+        offset (int): Where the crib sits in the plaintext.
+        key_len (int): The key length under test.
+    """
+    implied = xor_bytes(cipher_bytes[offset:offset + len(crib)], crib)
+    return {(offset + i) % key_len: implied[i] for i in range(min(key_len, len(implied)))}
+
+
+def build_constraint_table(cipher_bytes, cribs, key_lengths, min_printable=MIN_PRINTABLE):
+    """
+    Collects every consistent placement of every crib for every key length.
+
+    Args:
+        cipher_bytes (bytes): The ciphertext.
+        cribs (dict): name -> (crib bytes, anchor).
+        key_lengths (iterable): Key lengths to test.
+        min_printable (float): Printable share used to screen short free cribs,
+            or None to only place them when they are longer than the key.
+
+    Returns:
+        dict: key_len -> list of (name, offset, {phase: byte}, confirmed)
+            placements, where confirmed counts the crib bytes that repeat a
+            key phase and agreed.
+    """
+    table = {}
+    for key_len in key_lengths:
+        diffs = shifted_xor(cipher_bytes, key_len)
+        allowed = None
+        if min_printable is not None and any(anchor == ANCHOR_ANY and len(crib) <= key_len
+                                             for crib, anchor in cribs.values()):
+            allowed = allowed_key_bytes(cipher_bytes, key_len, min_printable)
+        placements = []
+        seen = set()
+        for name, (crib, anchor) in cribs.items():
+            confirmed = max(0, min(len(crib), len(cipher_bytes)) - key_len)
+            for offset in crib_placements(cipher_bytes, crib, key_len, anchor, diffs, allowed):
+                implied = implied_key_bytes(cipher_bytes, crib, offset, key_len)
+                # Repeated ciphertext gives the same key bytes again, not new evidence
+                signature = tuple(sorted(implied.items()))
+                if signature in seen:
+                    continue
+                seen.add(signature)
+                placements.append((name, offset, implied, confirmed))
+        table[key_len] = placements
+    return table
+
+
+def merge_placements(key_len, placements):
+    """
+    Merges placements into partial keys that agree on every shared phase.
+
+    A placement that agrees with a partial key on at least one shared phase is
+    merged into it. One that only touches new phases is merged into a copy, so
+    an unrelated crib cannot silently pollute a good partial key, and one that
+    merges nowhere starts a new partial key.
+
+    Args:
+        key_len (int): The key length.
+        placements (list): (name, offset, {phase: byte}, confirmed) tuples.
+
+    Returns:
+        list: (key, known, support, checks) tuples where key is a bytearray,
+            known a list of bools per phase, support the crib placements used
+            and checks the number of implied key bytes that agreed with another.
+    """
+    partial_keys = []
+    # Longest placements first, so the strongest evidence seeds the partial keys
+    for name, offset, implied, confirmed in sorted(placements, key=lambda p: -len(p[2])):
+        merged = False
+        for key, known, support, checks in list(partial_keys):
+            if any(known[phase] and key[phase] != byte for phase, byte in implied.items()):
+                continue
+            overlap = sum(known[phase] for phase in implied)
+            # Another copy of the same crib lining up is weak evidence: repeated
+            # ciphertext or one of many free placements agreeing by chance
+            confirms = overlap if all(other != name for other, _ in support) else 0
+            if not overlap:
+                if len(partial_keys) >= MAX_PARTIAL_KEYS:
+                    continue
+                key, known, support, checks = bytearray(key), list(known), list(support), list(checks)
+                partial_keys.append((key, known, support, checks))
+            for phase, byte in implied.items():
+                key[phase] = byte
+                known[phase] = True
+            checks[0] += confirms + confirmed
+            support.append((name, offset))
+            merged = True
+        if not merged and len(partial_keys) < MAX_PARTIAL_KEYS:
+            key, known = bytearray(key_len), [False] * key_len
+            for phase, byte in implied.items():
+                key[phase] = byte
+                known[phase] = True
+            partial_keys.append((key, known, [(name, offset)], [confirmed]))
+    return [(key, known, support, checks[0]) for key, known, support, checks in partial_keys]
+
+
+def evidence_score(cipher_bytes, key, known, support, cribs, column_scores, weights=BYTE_WEIGHTS):
+    """
+    Scores a partial key by how English-like it decrypts the rest of its columns.
+
+    The crib bytes themselves always decrypt perfectly, so they are left out,
+    and the average is shrunk towards the weight of a random byte so a key
+    backed by only a handful of extra bytes cannot score like a proven one.
+
+    Args:
+        cipher_bytes (bytes): The ciphertext.
+        key (bytearray): The partial key.
+        known (list): Which phases of the key are known.
+        support (list): (crib name, offset) placements behind the key.
+        cribs (dict): name -> (crib bytes, anchor).
+        column_scores (list): Per phase, the 256 single_byte_xor_scores of its column.
+        weights (list): 256 per-byte plaintext weights.
+
+    Returns:
+        float: Shrunk average plaintext weight per byte.
+    """
+    key_len = len(key)
+    total = count = 0
+    for phase in range(key_len):
+        if known[phase]:
+            total += column_scores[phase][key[phase]]
+            count += len(range(phase, len(cipher_bytes), key_len))
+    covered = set()
+    for name, offset in support:
+        crib = cribs[name][0]
+        covered.update(range(offset, min(offset + len(crib), len(cipher_bytes))))
+    for pos in covered:
+        total -= weights[cipher_bytes[pos] ^ key[pos % key_len]]
+    count -= len(covered)
+    return (total + EVIDENCE_PRIOR * sum(weights) / 256) / (count + EVIDENCE_PRIOR)
+
+
+def same_crib_bytes(shorter, longer):
+    """
+    Tells whether a shorter candidate key repeats to every crib-derived byte
+    of a longer one (candidates as built in search_cribs).
+    """
+    _, _, short_len, short_key, short_known, _ = shorter
+    _, _, key_len, key, known, _ = longer
+    return all(short_known[phase % short_len] and key[phase] == short_key[phase % short_len]
+               for phase in range(key_len) if known[phase])
+
+
+def search_cribs(cipher_bytes, cribs=None, key_lengths=None, max_key_length=40, fill=True,
+                 top=5, min_printable=MIN_PRINTABLE, weights=BYTE_WEIGHTS, verbose=True):
+    """
+    Searches every key length and crib placement for consistent partial keys.
+
+    Every column's 256 key scores are computed once per length, so each
+    partial key is ranked by evidence_score without decrypting anything.
+    Key bytes no crib covers are filled with the best statistical byte.
+
+    Args:
+        cipher_bytes (bytes): The ciphertext.
+        cribs (dict): name -> (crib bytes, anchor); DEFAULT_CRIBS if None.
+        key_lengths (iterable): Key lengths to test, default 1..max_key_length.
+        max_key_length (int): Longest key tried when key_lengths is None.
+        fill (bool): Complete unknown key bytes from column frequency statistics
+            (otherwise they are left as zero in the returned key).
+        top (int): How many results to return.
+        min_printable (float): Printable share used to screen short free cribs
+            (None for binary plaintexts).
+        weights (list): 256 per-byte plaintext weights used to rank partial keys
+            and to fill unknown key bytes.
+        verbose (bool): Print the results.
+
+    Returns:
+        list: (key_len, key, known, support, score, decrypted) tuples, best first.
+            score is (evidence_score, confirmed key bytes); results are ranked
+            by evidence_score + CONFIRMED_BONUS per confirmed byte.
+    """
+    if cribs is None:
+        cribs = DEFAULT_CRIBS
+    if key_lengths is None:
+        key_lengths = range(1, max_key_length + 1)
+    key_lengths = [key_len for key_len in key_lengths if 1 <= key_len < len(cipher_bytes)]
+
+    if verbose:
+        print("\n" + "=" * 80)
+        print("MULTI-CRIB KNOWN-PLAINTEXT SEARCH")
+        print("=" * 80)
+        print(f"Cribs: {', '.join(cribs)}")
+        print(f"Key lengths: {len(key_lengths)}")
+        print("-" * 80)
+
+    table = build_constraint_table(cipher_bytes, cribs, key_lengths, min_printable)
+    candidates = []
+    for key_len, placements in table.items():
+        if not placements:
+            continue
+        column_scores = [single_byte_xor_scores(cipher_bytes[phase::key_len], weights)
+                         for phase in range(key_len)]
+        best = [max(range(256), key=scores.__getitem__) for scores in column_scores]
+        for key, known, support, checks in merge_placements(key_len, placements):
+            score = evidence_score(cipher_bytes, key, known, support, cribs, column_scores, weights)
+            for phase in range(key_len):
+                if not known[phase]:
+                    key[phase] = best[phase]
+            candidates.append((score, checks, key_len, bytes(key), known, support))
+
+    candidates = drop_overfit_multiples(candidates, lambda c: c[2], lambda c: c[0],
+                                        CRIB_DIVISOR_TOLERANCE, same_crib_bytes)
+    candidates.sort(key=lambda c: (c[0] + CONFIRMED_BONUS * c[1], -c[2]), reverse=True)
+
+    results = []
+    for score, checks, key_len, key, known, support in candidates[:top]:
+        if not fill:
+            key = bytes(byte if k else 0 for byte, k in zip(key, known))
+        decrypted = repeating_key_xor(cipher_bytes, key)
+        results.append((key_len, key, known, support, (score, checks), decrypted))
+
+        if verbose:
+            key_view = ''.join(f"{b:02x}" if k or fill else '??' for b, k in zip(key, known))
+            print(f"Key length {key_len}: score {score:.3f}, {checks} confirmed byte(s), "
+                  f"{sum(known)}/{key_len} from cribs")
+            print(f"  Key (hex): {key_view}")
+            print(f"  Key (str): '{key.decode('utf-8', errors='replace')}'")
+            print(f"  Cribs: {', '.join(f'{name}@{offset}' for name, offset in support)}")
+            print(f"  Decrypted: {decrypted[:200].decode('utf-8', errors='replace')}")
+            print()
+    return results
+
+
+def parse_crib(text, hex_crib=False):
+    """
+    Parses a CRIB[@start|@end|@any] command-line argument.
+
+    Returns:
+        tuple: (crib bytes, anchor)
+    """
+    anchor = ANCHOR_ANY
+    body, sep, suffix = text.rpartition('@')
+    if sep and suffix in (ANCHOR_START, ANCHOR_END, ANCHOR_ANY):
+        text, anchor = body, suffix
+    crib = bytes.fromhex(text) if hex_crib else text.encode('utf-8')
+    return crib, anchor
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Find repeating XOR keys from several cribs at any position and key length.")
+    parser.add_argument('ciphertext', help="Hex ciphertext, or a path to a raw ciphertext file")
+    parser.add_argument('-c', '--crib', action='append', default=[],
+                        help="Known plaintext, optionally suffixed with @start, @end or @any (default)")
+    parser.add_argument('--crib-hex', action='append', default=[], help="Known plaintext as hex")
+    parser.add_argument('--max-key-length', type=int, default=40, help="Longest key length tried")
+    parser.add_argument('--top', type=int, default=5, help="Number of results to show")
+    parser.add_argument('--no-fill', action='store_true',
+                        help="Leave key bytes not covered by a crib unknown instead of guessing them")
+    args = parser.parse_args(argv)
+
+    if os.path.isfile(args.ciphertext):
+        with open(args.ciphertext, 'rb') as f:
+            cipher_bytes = f.read()
+    else:
+        try:
+            cipher_bytes = bytes.fromhex(args.ciphertext)
+        except ValueError:
+            parser.error("Ciphertext is neither a file nor a valid hex string.")
+
+    cribs = {}
+    try:
+        for text in args.crib:
+            cribs[text] = parse_crib(text)
+        for text in args.crib_hex:
+            cribs[text] = parse_crib(text, hex_crib=True)
+    except ValueError:
+        parser.error("Invalid hex crib.")
+
+    results = search_cribs(cipher_bytes, cribs or None, max_key_length=args.max_key_length,
+                           fill=not args.no_fill, top=args.top)
+    if not results:
+        print("No key length is consistent with the cribs.")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
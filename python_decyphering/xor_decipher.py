@@ -1,38 +1,72 @@
+import argparse
 import binascii
+import heapq
+import json
+import sys
+from functools import partial
+from multiprocessing import Pool
 
-def repeating_key_xor(ciphertext_bytes, key_bytes):
+from xor_core import byte_histogram, repeating_key_xor, stream_main, xor_bytes
+
+# Common English characters, weighted higher by score_text
+COMMON_CHARS = b"ETAOIN SHRDLUetaoinshrdlu"
+
+# Per-byte weights matching score_text: +1 for printable ASCII, +2 for common chars
+BYTE_WEIGHTS = [(1 if 32 <= b <= 126 else 0) + (2 if b in COMMON_CHARS else 0) for b in range(256)]
+
+# Lines handed to a worker process per task in batch mode
+BATCH_CHUNK_LINES = 256
+
+# Candidates shown by the interactive brute force
+DEFAULT_TOP_K = 10
+
+def score_text(text_bytes):
     """
-    Applies a repeating key XOR to a byte string.
+    Scores a byte string based on the frequency of English characters.
+    A higher score indicates a higher probability of being valid English text.
+    """
+    # A simple scoring mechanism: printable ASCII scores 1, common English letters 2 more
+    histogram = byte_histogram(text_bytes)
+    return sum(count * BYTE_WEIGHTS[byte] for byte, count in enumerate(histogram) if count)
+
+def single_byte_xor_scores(ciphertext_bytes, weights=BYTE_WEIGHTS):
+    """
+    Scores all 256 single-byte keys at once from one byte histogram.
+    
+    Decrypting with key k turns byte b into b ^ k, so the score of key k is
+    the histogram weighted by the weight table permuted by k. This costs
+    O(n + 256^2) instead of 256 full decryptions.
     
     Args:
         ciphertext_bytes (bytes): The raw bytes of the encrypted message.
-        key_bytes (bytes): The raw bytes of the key.
+        weights (list): 256 per-byte plaintext weights (default: score_text weights).
         
     Returns:
-        bytes: The resulting bytes after XORing.
+        list: 256 scores, indexed by key.
     """
-    if not key_bytes:
-        return ciphertext_bytes
-        
-    decrypted_bytes = bytearray()
-    for i in range(len(ciphertext_bytes)):
-        decrypted_bytes.append(ciphertext_bytes[i] ^ key_bytes[i % len(key_bytes)])
-    return bytes(decrypted_bytes)
+    histogram = byte_histogram(ciphertext_bytes)
+    present = [(byte, count) for byte, count in enumerate(histogram) if count]
+    return [sum(count * weights[byte ^ key_val] for byte, count in present)
+            for key_val in range(256)]
 
-def score_text(text_bytes):
+def single_byte_xor_top_k(ciphertext_bytes, k=DEFAULT_TOP_K, weights=BYTE_WEIGHTS):
     """
-    Scores a byte string based on the frequency of English characters.
-    A higher score indicates a higher probability of being valid English text.
+    Returns the k best single-byte keys, decrypting only those k candidates.
+    
+    Args:
+        ciphertext_bytes (bytes): The raw bytes of the encrypted message.
+        k (int): How many candidates to return.
+        weights (list): 256 per-byte plaintext weights (default: score_text weights).
+        
+    Returns:
+        A list of tuples (score, key, decrypted_text) sorted by score.
     """
-    score = 0
-    # A simple scoring mechanism: prioritize common English letters
-    common_chars = b"ETAOIN SHRDLUetaoinshrdlu"
-    for byte in text_bytes:
-        if 32 <= byte <= 126: # Check for printable ASCII
-            score += 1
-        if bytes([byte]) in common_chars:
-            score += 2 # Give extra points for very common characters
-    return score
+    scores = single_byte_xor_scores(ciphertext_bytes, weights)
+    best_keys = heapq.nlargest(k, range(256), key=scores.__getitem__)
+    return [(scores[key_val],
+             key_val,
+             repeating_key_xor(ciphertext_bytes, bytes([key_val])).decode('utf-8', errors='ignore'))
+            for key_val in best_keys]
 
 def single_byte_xor_brute_force(ciphertext_bytes):
     """
@@ -44,11 +78,12 @@ def single_byte_xor_brute_force(ciphertext_bytes):
     Returns:
         A list of tuples (score, key, decrypted_text) sorted by score.
     """
+    scores = single_byte_xor_scores(ciphertext_bytes)
     results = []
     for key_val in range(256):
         key_byte = bytes([key_val])
         decrypted = repeating_key_xor(ciphertext_bytes, key_byte)
-        score = score_text(decrypted)
+        score = scores[key_val]
         
         try:
             # Attempt to decode for display purposes
@@ -87,8 +122,7 @@ def xor_hex_strings(hex1, hex2):
     """
     bytes1 = bytes.fromhex(hex1)
     bytes2 = bytes.fromhex(hex2)
-    result = bytes(a ^ b for a, b in zip(bytes1, bytes2))
-    return result.hex()
+    return xor_bytes(bytes1, bytes2).hex()
 
 def brute_force_single_byte_xor_from_hex(hex_string):
     """
@@ -103,12 +137,13 @@ def brute_force_single_byte_xor_from_hex(hex_string):
     ciphertext = bytes.fromhex(hex_string)
     return single_byte_xor_brute_force(ciphertext)
 
-def brute_force_single_byte_xor_from_input(hex_string=None):
+def brute_force_single_byte_xor_from_input(hex_string=None, top_k=None):
     """
     Brute-force single-byte XOR decryption for a user-provided hex string.
     
     Args:
         hex_string (str, optional): The hex string to decrypt. If None, prompts user for input.
+        top_k (int, optional): Only decrypt and show the top_k best keys. If None, shows all 256.
     """
     if hex_string is None:
         hex_string = input("Enter the encrypted message (in hex format): ").strip()
@@ -120,13 +155,128 @@ def brute_force_single_byte_xor_from_input(hex_string=None):
         return
 
     print("\n--- Brute-forcing single-byte XOR keys ---")
-    brute_force_results = single_byte_xor_brute_force(ciphertext)
+    if top_k is None:
+        brute_force_results = single_byte_xor_brute_force(ciphertext)
+    else:
+        brute_force_results = single_byte_xor_top_k(ciphertext, top_k)
 
-    print("Top 100 possible decryptions:")
-    for i, (score, key, text) in enumerate(brute_force_results):#(brute_force_results[:100]):
+    print(f"Top {len(brute_force_results)} possible decryptions:")
+    for i, (score, key, text) in enumerate(brute_force_results):
         print(f"#{i+1}: Score={score}, Key=0x{key:02x} ('{chr(key) if 32<=key<=126 else '.'}'), Text='{text}'")
 
+def solve_hex_line(numbered_line, weights=BYTE_WEIGHTS):
+    """
+    Finds the best single-byte key for one hex-encoded ciphertext line.
+    
+    Args:
+        numbered_line (tuple): (line number, hex string).
+        weights (list): 256 per-byte plaintext weights.
+        
+    Returns:
+        dict: JSON-ready result with the line number, key, score, score per
+            byte and plaintext, or an error for lines that are not valid hex.
+    """
+    line_no, hex_string = numbered_line
+    try:
+        ciphertext = bytes.fromhex(hex_string)
+    except ValueError:
+        return {'line': line_no, 'error': 'invalid hex'}
+    scores = single_byte_xor_scores(ciphertext, weights)
+    key_val = max(range(256), key=scores.__getitem__)
+    plaintext = repeating_key_xor(ciphertext, bytes([key_val]))
+    return {'line': line_no,
+            'key': key_val,
+            'score': scores[key_val],
+            'per_byte': round(scores[key_val] / len(ciphertext), 4),
+            'plaintext': plaintext.decode('utf-8', errors='replace')}
+
+def batch_brute_force(lines, weights=BYTE_WEIGHTS, processes=None, chunk_lines=BATCH_CHUNK_LINES):
+    """
+    Brute-forces many independent single-byte XOR ciphertexts across a process pool.
+    
+    Lines are sent to the workers in chunks of chunk_lines, so the IPC cost is
+    paid per chunk instead of per line. Results come back in input order as
+    soon as each chunk is done.
+    
+    Args:
+        lines: Iterable of hex strings (blank lines are skipped).
+        weights (list): 256 per-byte plaintext weights.
+        processes (int): Pool size (None = number of CPUs, 1 = no pool).
+        chunk_lines (int): Lines per worker task.
+        
+    Yields:
+        dict: One solve_hex_line result per non-blank line.
+    """
+    numbered = ((line_no, line.strip()) for line_no, line in enumerate(lines, 1) if line.strip())
+    solve = partial(solve_hex_line, weights=weights)
+    if processes == 1:
+        yield from map(solve, numbered)
+        return
+    with Pool(processes) as pool:
+        yield from pool.imap(solve, numbered, chunksize=chunk_lines)
+
+def batch_main(argv):
+    """
+    Command-line batch mode: one hex ciphertext per line in, JSONL results out,
+    followed by a report of the most English-like lines on stderr.
+    
+    Args:
+        argv (list): Command-line arguments (without the program name and 'batch').
+    """
+    parser = argparse.ArgumentParser(
+        prog='xor_decipher.py batch',
+        description="Brute-force single-byte XOR on every line of a file of hex ciphertexts.")
+    parser.add_argument('input', help="File with one hex ciphertext per line ('-' for stdin)")
+    parser.add_argument('-o', '--output', default='-', help="JSONL output file ('-' for stdout)")
+    parser.add_argument('--top', type=int, default=10, help="How many of the most English lines to report")
+    parser.add_argument('--processes', type=int, default=None, help="Worker processes (default: all CPUs)")
+    parser.add_argument('--chunk-lines', type=int, default=BATCH_CHUNK_LINES,
+                        help=f"Lines per worker task (default {BATCH_CHUNK_LINES})")
+    parser.add_argument('--ngram', action='store_true',
+                        help="Score with the English byte model from ngram_scorer (needs numpy)")
+    args = parser.parse_args(argv)
+    
+    weights = BYTE_WEIGHTS
+    if args.ngram:
+        from ngram_scorer import byte_weights
+        weights = byte_weights()
+    
+    in_stream = sys.stdin if args.input == '-' else open(args.input)
+    out_stream = sys.stdout if args.output == '-' else open(args.output, 'w')
+    best = []
+    total = 0
+    try:
+        for result in batch_brute_force(in_stream, weights, args.processes, args.chunk_lines):
+            out_stream.write(json.dumps(result) + '\n')
+            total += 1
+            if 'error' not in result:
+                # Keep the most English-like lines in a bounded min-heap
+                entry = (result['per_byte'], -result['line'], result)
+                if len(best) < args.top:
+                    heapq.heappush(best, entry)
+                else:
+                    heapq.heappushpop(best, entry)
+    finally:
+        if in_stream is not sys.stdin:
+            in_stream.close()
+        if out_stream is not sys.stdout:
+            out_stream.close()
+    
+    print(f"Processed {total} lines. Most English-like:", file=sys.stderr)
+    for per_byte, _, result in sorted(best, key=lambda entry: entry[:2], reverse=True):
+        print(f"  line {result['line']}: key=0x{result['key']:02x} score/byte={per_byte:.3f} "
+              f"{result['plaintext']!r}", file=sys.stderr)
+
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] == 'batch':
+        # Batch mode: python xor_decipher.py batch LINES.txt [-o results.jsonl]
+        batch_main(sys.argv[2:])
+        return
+    if len(sys.argv) > 1:
+        # Streaming mode: python xor_decipher.py --key KEY [-i FILE] [-o FILE] [--hex-in] [--hex-out]
+        stream_main(sys.argv[1:], "Decrypt a file or stdin with a repeating XOR key in fixed-size chunks.")
+        return
+
     print("=" * 50)
     print("--- XOR Decrypter ---")
     print("=" * 50)
@@ -158,8 +308,18 @@ def main():
         print(f"Decrypted message (as text): {decrypted.decode('utf-8', errors='ignore')}")
 
     elif choice == "2":
-        # Brute-force single-byte XOR
-        brute_force_single_byte_xor_from_input()
+        # Brute-force single-byte XOR, decrypting only the best k keys
+        hex_string = input("Enter the encrypted message (in hex format): ").strip()
+        count = input(f"How many candidates to show (1-256, default {DEFAULT_TOP_K}): ").strip()
+        try:
+            top_k = int(count) if count else DEFAULT_TOP_K
+        except ValueError:
+            print("Invalid count. Please provide an integer.")
+            return
+        if not 1 <= top_k <= 256:
+            print("Count must be between 1 and 256.")
+            return
+        brute_force_single_byte_xor_from_input(hex_string, top_k)
 
     elif choice == "3":
         # XOR a string with a specific key
@@ -4,17 +4,97 @@ Comprehensive XOR Key Finder
 Uses known-plaintext attack to find single-byte or repeating XOR keys.
 """
 
+import argparse
+import mmap
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 
+from key_length_core import drop_overfit_multiples
+from xor_core import DEFAULT_CHUNK_SIZE, popcount, repeating_key_xor, shifted_xor
+from xor_crib_search import ANCHOR_ANY, search_cribs
+from xor_decipher import BYTE_WEIGHTS, single_byte_xor_scores
 
-def repeating_key_xor(ciphertext_bytes, key_bytes):
-    """Apply repeating key XOR to decrypt ciphertext."""
-    if not key_bytes:
-        return ciphertext_bytes
-    decrypted_bytes = bytearray()
-    for i in range(len(ciphertext_bytes)):
-        decrypted_bytes.append(ciphertext_bytes[i] ^ key_bytes[i % len(key_bytes)])
-    return bytes(decrypted_bytes)
+# Bytes of ciphertext scanned per window in the memory-mapped search
+SEARCH_WINDOW = 16 * DEFAULT_CHUNK_SIZE
+
+# Share of a multiple's score a key length needs to be preferred over it, both
+# when ranking lengths and when ranking the broken keys
+XOR_DIVISOR_TOLERANCE = 0.9
+
+# Key lengths from which the column solver fans out to a process pool
+PARALLEL_MIN_KEY_LENGTH = 16
+
+# How far a crib placement away from position 0 must beat the runner-up to be trusted
+CRIB_MARGIN = 1.2
+
+
+def find_crib_offsets(cipher_buffer, known_plain, window=SEARCH_WINDOW):
+    """
+    Yields every offset where known_plain could sit under a single-byte XOR key.
+    
+    With a single-byte key, c[i] ^ c[i+1] == p[i] ^ p[i+1], so the key cancels
+    out. The ciphertext is XORed with itself shifted by one byte and the crib's
+    own difference pattern is located with bytes.find. The buffer is processed
+    in windows, so it can be an mmap of a multi-GB file.
+    
+    Args:
+        cipher_buffer: bytes, bytearray or mmap with the ciphertext.
+        known_plain (str or bytes): The known plaintext (crib).
+        window (int): Number of ciphertext bytes scanned per step.
+    
+    Yields:
+        int: Offsets where the crib is consistent with a single-byte key.
+    """
+    if isinstance(known_plain, str):
+        known_plain = known_plain.encode('utf-8')
+    crib_len = len(known_plain)
+    if crib_len == 0:
+        return
+    pattern = shifted_xor(known_plain, 1)
+    
+    for start in range(0, len(cipher_buffer) - crib_len + 1, window):
+        segment = cipher_buffer[start:start + window + crib_len - 1]
+        diffs = shifted_xor(segment, 1)
+        pos = diffs.find(pattern) if crib_len > 1 else 0
+        while 0 <= pos < window and pos + crib_len <= len(segment):
+            yield start + pos
+            pos = diffs.find(pattern, pos + 1) if crib_len > 1 else pos + 1
+
+
+def find_single_byte_key_in_file(filepath, known_plain, preview_length=64, verbose=True):
+    """
+    Searches a ciphertext file for a crib under a single-byte XOR key.
+    
+    The file is memory-mapped and never loaded into Python lists, so
+    multi-GB dumps can be searched.
+    
+    Args:
+        filepath (str): Path to the raw ciphertext file.
+        known_plain (str or bytes): The known plaintext (crib).
+        preview_length (int): Bytes decrypted from each hit for display.
+        verbose (bool): Print hits as they are found.
+    
+    Returns:
+        list: (offset, key, preview_bytes) tuples.
+    """
+    if isinstance(known_plain, str):
+        known_plain = known_plain.encode('utf-8')
+    results = []
+    
+    with open(filepath, 'rb') as f:
+        if f.seek(0, 2) == 0:
+            return results
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for offset in find_crib_offsets(mm, known_plain):
+                key = mm[offset] ^ known_plain[0]
+                preview = repeating_key_xor(mm[offset:offset + preview_length], bytes([key]))
+                if verbose:
+                    print(f"! Offset {offset}: key {key} (0x{key:02x}), "
+                          f"plaintext: {preview.decode('utf-8', errors='replace')!r}")
+                results.append((offset, key, preview))
+    
+    return results
 
 
 def find_single_byte_key(cipher_bytes, known_plain, verbose=True):
@@ -29,29 +109,25 @@ def find_single_byte_key(cipher_bytes, known_plain, verbose=True):
         print("STEP 1: Testing Single-Byte XOR")
         print("=" * 80)
     
-    for offset in range(len(cipher_bytes) - len(known_plain) + 1):
-        potential_key_bytes = []
-        for i in range(len(known_plain)):
-            potential_key_bytes.append(cipher_bytes[offset + i] ^ ord(known_plain[i]))
+    crib_bytes = known_plain.encode('utf-8')
+    for offset in find_crib_offsets(cipher_bytes, crib_bytes):
+        # The crib's difference pattern matched, so all implied key bytes agree
+        key = cipher_bytes[offset] ^ crib_bytes[0]
+        decrypted = repeating_key_xor(cipher_bytes, bytes([key]))
         
-        # Check if all bytes are the same (single-byte key)
-        if len(set(potential_key_bytes)) == 1:
-            key = potential_key_bytes[0]
-            decrypted = bytes([b ^ key for b in cipher_bytes])
+        try:
+            decrypted_str = decrypted.decode('utf-8', errors='strict')
+            if verbose:
+                print(f"! Found single-byte XOR key at offset {offset}!")
+                print(f"  Key: {key} (0x{key:02x}, ASCII: '{chr(key) if 32<=key<=126 else '?'}')")
+                print(f"  Decrypted: {decrypted_str}")
+                if known_plain in decrypted_str:
+                    print(f"  !!! SUCCESS! Contains '{known_plain}' !!!")
+                print()
             
-            try:
-                decrypted_str = decrypted.decode('utf-8', errors='strict')
-                if verbose:
-                    print(f"! Found single-byte XOR key at offset {offset}!")
-                    print(f"  Key: {key} (0x{key:02x}, ASCII: '{chr(key) if 32<=key<=126 else '?'}')")
-                    print(f"  Decrypted: {decrypted_str}")
-                    if known_plain in decrypted_str:
-                        print(f"  !!! SUCCESS! Contains '{known_plain}' !!!")
-                    print()
-                
-                results.append((offset, key, decrypted_str))
-            except:
-                pass
+            results.append((offset, key, decrypted_str))
+        except:
+            pass
     
     if verbose and not results:
         print("No single-byte key found.")
@@ -59,55 +135,61 @@ def find_single_byte_key(cipher_bytes, known_plain, verbose=True):
     return results
 
 
-def analyze_repeating_patterns(cipher_bytes, verbose=True):
+def rank_key_lengths(cipher_bytes, min_length=1, max_length=40, verbose=True):
     """
-    Analyze ciphertext for repeating patterns to determine likely key length.
-    Returns list of likely key lengths.
+    Rank candidate repeating-key lengths without building substring tables.
+    
+    For each length L the ciphertext is XORed with itself shifted by L. At the
+    right length (or a multiple of it) the key cancels out and what remains is
+    plaintext XOR plaintext, which has:
+      - a low normalized Hamming distance (set bits per bit, ~0.5 for random data)
+      - a high coincidence rate (zero bytes = equal plaintext bytes, ~1/256 for
+        random data, ~0.06+ for English)
+    The score is coincidence + (0.5 - hamming), so higher is better.
+    Multiples of the true length score just as well, so a length that has a
+    shorter divisor scoring at least XOR_DIVISOR_TOLERANCE as high is ranked
+    after all lengths without one.
+    
+    Args:
+        cipher_bytes (bytes): The ciphertext.
+        min_length (int): Smallest key length to test.
+        max_length (int): Largest key length to test (256+ is fine).
+        verbose (bool): Print the top of the ranking.
+    
+    Returns:
+        list: (key_length, score, hamming, coincidence) tuples, best first.
     """
+    ranking = []
+    # At least one full repetition of the key is needed for a meaningful overlap
+    for key_len in range(max(1, min_length), min(max_length, len(cipher_bytes) // 2) + 1):
+        diffs = shifted_xor(cipher_bytes, key_len)
+        hamming = popcount(diffs) / (8 * len(diffs))
+        coincidence = diffs.count(0) / len(diffs)
+        ranking.append((key_len, coincidence + (0.5 - hamming), hamming, coincidence))
+    
+    kept = set(drop_overfit_multiples(ranking, lambda x: x[0], lambda x: x[1], XOR_DIVISOR_TOLERANCE))
+    ranking.sort(key=lambda x: (x in kept, x[1]), reverse=True)
+    
     if verbose:
         print("\n" + "=" * 80)
-        print("STEP 2: Analyzing Repeating Patterns")
+        print("STEP 2: Ranking Key Lengths (Hamming distance / coincidence)")
         print("=" * 80)
+        for key_len, score, hamming, coincidence in ranking[:10]:
+            print(f"  Length {key_len:3d}: score={score:.4f}  hamming={hamming:.4f}  coincidence={coincidence:.4f}")
     
-    likely_key_lengths = set()
-    
-    # Look for repeating sequences in ciphertext
-    for block_size in range(2, 11):
-        blocks = {}
-        for i in range(0, len(cipher_bytes) - block_size + 1):
-            block = cipher_bytes[i:i+block_size]
-            if block in blocks:
-                blocks[block].append(i)
-            else:
-                blocks[block] = [i]
-        
-        repeating = {k: v for k, v in blocks.items() if len(v) > 1}
-        if repeating and verbose:
-            print(f"\nBlock size {block_size}: Found {len(repeating)} repeating sequences")
-            for block, positions in list(repeating.items())[:2]:  # Show first 2
-                distances = [positions[i+1] - positions[i] for i in range(len(positions)-1)]
-                print(f"  {block.hex()} at positions {positions}, distances: {distances}")
-                
-                # The distance between repeating patterns likely relates to key length
-                for dist in distances:
-                    # Key length is likely a divisor of the distance
-                    for divisor in range(1, min(dist + 1, 21)):
-                        if dist % divisor == 0:
-                            likely_key_lengths.add(divisor)
-    
-    # Sort and return most likely lengths (prioritize common lengths)
-    sorted_lengths = sorted(likely_key_lengths)
-    if verbose:
-        print(f"\nLikely key lengths based on patterns: {sorted_lengths[:10]}")
-    
-    return sorted_lengths
+    return ranking
 
 
-def find_repeating_key(cipher_bytes, known_plain, max_key_length=20, verbose=True):
+def find_repeating_key(cipher_bytes, known_plain, max_key_length=20, verbose=True, key_lengths=None):
     """
     Try to find a repeating XOR key using known plaintext.
+    Tests key_lengths in the given order (e.g. from rank_key_lengths),
+    or every length from 1 to max_key_length.
     Returns list of (key_length, key, decrypted_text) tuples.
     """
+    if key_lengths is None:
+        key_lengths = range(1, max_key_length + 1)
+    
     if verbose:
         print("\n" + "=" * 80)
         print("STEP 3: Finding Repeating Key")
@@ -122,12 +204,12 @@ def find_repeating_key(cipher_bytes, known_plain, max_key_length=20, verbose=Tru
         print(f"  Hex: {partial_key.hex()}")
         print(f"  String: '{partial_key.decode('utf-8', errors='ignore')}'")
         print(f"  Bytes: {list(partial_key)}")
-        print(f"\nTesting different key lengths (1-{max_key_length})...")
+        print(f"\nTesting {len(key_lengths)} key lengths...")
         print("-" * 80)
     
     results = []
     
-    for key_len in range(1, max_key_length + 1):
+    for key_len in key_lengths:
         # Use the first key_len bytes as the repeating key
         test_key = partial_key[:key_len]
         decrypted = repeating_key_xor(cipher_bytes, test_key)
@@ -231,7 +313,135 @@ def try_common_variations(cipher_bytes, partial_key, verbose=True):
     return results
 
 
+def best_key_byte(column, weights=BYTE_WEIGHTS):
+    """Return the single-byte key that scores best on one ciphertext column."""
+    scores = single_byte_xor_scores(column, weights)
+    return max(range(256), key=scores.__getitem__)
+
+
+def minimal_period(key):
+    """Return the shortest key that repeats to `key` (e.g. b'abcabc' -> b'abc')."""
+    for period in range(1, len(key)):
+        if len(key) % period == 0 and key == key[:period] * (len(key) // period):
+            return key[:period]
+    return key
+
+
+def break_repeating_key_xor(cipher_bytes, key_lengths=None, max_key_length=40, top_lengths=5,
+                            weights=BYTE_WEIGHTS, processes=None, verbose=True):
+    """
+    Break a repeating-key XOR without any known plaintext.
+    
+    For each candidate length the ciphertext is transposed into key_len
+    columns; every column was XORed with one key byte, so it is solved with
+    the batched single-byte scorer. Columns are independent, so the columns of
+    all long keys are submitted at once to one process pool.
+    
+    Args:
+        cipher_bytes (bytes): The ciphertext.
+        key_lengths (list): Lengths to try. Defaults to the top_lengths
+            best lengths from rank_key_lengths.
+        max_key_length (int): Largest length ranked when key_lengths is None.
+        top_lengths (int): How many ranked lengths to try.
+        weights (list): 256 per-byte plaintext weights for the column scorer.
+        processes (int): Pool size (None = number of CPUs, 1 = no pool).
+        verbose (bool): Print each candidate.
+    
+    Returns:
+        list: (key_length, key, decrypted_text, score) tuples, best first.
+            score is the average plaintext weight per byte.
+    """
+    if verbose:
+        print("\n" + "=" * 80)
+        print("STEP 5: Statistical Repeating-Key Breaker (no crib)")
+        print("=" * 80)
+    
+    if key_lengths is None:
+        ranking = rank_key_lengths(cipher_bytes, 1, max_key_length, verbose=False)
+        key_lengths = [key_len for key_len, _, _, _ in ranking[:top_lengths]]
+    
+    solve_column = partial(best_key_byte, weights=weights)
+    results = []
+    seen_keys = set()
+    
+    long_lengths = [key_len for key_len in key_lengths if key_len >= PARALLEL_MIN_KEY_LENGTH]
+    pool = ProcessPoolExecutor(max_workers=processes) if long_lengths and processes != 1 else None
+    try:
+        # Executor.map submits right away, so the columns of every long key
+        # are queued before the first result is awaited
+        pending = {key_len: pool.map(solve_column, [cipher_bytes[i::key_len] for i in range(key_len)],
+                                     chunksize=max(1, key_len // 32))
+                   for key_len in long_lengths} if pool is not None else {}
+        keys = [bytes(pending[key_len]) if key_len in pending
+                else bytes(map(solve_column, [cipher_bytes[i::key_len] for i in range(key_len)]))
+                for key_len in key_lengths]
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    
+    for key_len, key in zip(key_lengths, keys):
+        # A multiple of the true length yields the true key repeated
+        key = minimal_period(key)
+        if key in seen_keys:
+            continue
+        seen_keys.add(key)
+        
+        decrypted = repeating_key_xor(cipher_bytes, key)
+        score = sum(weights[b] for b in decrypted) / max(1, len(decrypted))
+        decrypted_str = decrypted.decode('utf-8', errors='replace')
+        
+        if verbose:
+            print(f"! Key length {key_len}: key '{key.decode('utf-8', errors='replace')}' ({key.hex()})")
+            print(f"  Score: {score:.3f}")
+            print(f"  Decrypted: {decrypted_str[:120]}")
+            print()
+        
+        results.append((len(key), key, decrypted_str, score))
+    
+    results = drop_overfit_multiples(results, lambda r: r[0], lambda r: r[3], XOR_DIVISOR_TOLERANCE)
+    results.sort(key=lambda x: x[3], reverse=True)
+    return results
+
+
+def file_main(argv):
+    """
+    Command-line mode: search a raw ciphertext file instead of pasted hex.
+    
+    Args:
+        argv (list): Command-line arguments (without the program name).
+    """
+    parser = argparse.ArgumentParser(
+        description="Search a raw ciphertext file for a known plaintext under a single-byte XOR key, "
+                    "or break a repeating-key XOR statistically when no crib is given.")
+    parser.add_argument('file', help="Path to the raw ciphertext file")
+    parser.add_argument('crib', nargs='?', help="Known plaintext, e.g. 'crypto{'")
+    parser.add_argument('--preview', type=int, default=64, help="Bytes to decrypt at each hit")
+    parser.add_argument('--max-key-length', type=int, default=40, help="Longest key tried without a crib")
+    parser.add_argument('--processes', type=int, default=None, help="Worker processes for long keys")
+    parser.add_argument('--ngram', action='store_true',
+                        help="Score columns with the English byte model from ngram_scorer (needs numpy)")
+    args = parser.parse_args(argv)
+    
+    if args.crib:
+        results = find_single_byte_key_in_file(args.file, args.crib, args.preview)
+        print(f"\n{len(results)} candidate offset(s) found.")
+        return
+    
+    with open(args.file, 'rb') as f:
+        cipher_bytes = f.read()
+    weights = BYTE_WEIGHTS
+    if args.ngram:
+        from ngram_scorer import byte_weights
+        weights = byte_weights()
+    break_repeating_key_xor(cipher_bytes, max_key_length=args.max_key_length,
+                            weights=weights, processes=args.processes)
+
+
 def main():
+    if len(sys.argv) > 1:
+        file_main(sys.argv[1:])
+        return
+    
     print("=" * 80)
     print("XOR KEY FINDER - Known Plaintext Attack")
     print("=" * 80)
@@ -246,10 +456,18 @@ def main():
         print("Error: Invalid hex string.")
         return
     
-    known_plain = input("Enter the known plaintext (e.g., 'crypto{'): ").strip()
+    known_plain = input("Enter the known plaintext (e.g., 'crypto{', empty to break statistically): ").strip()
     
     if not known_plain:
-        print("Error: Known plaintext cannot be empty.")
+        results = break_repeating_key_xor(cipher_bytes)
+        if results:
+            key_len, key, decrypted, score = results[0]
+            print("\n" + "=" * 80)
+            print("BEST STATISTICAL RESULT")
+            print("=" * 80)
+            print(f"Key: '{key.decode('utf-8', errors='replace')}' ({key.hex()})")
+            print(f"Key length: {key_len} bytes")
+            print(f"Decrypted: {decrypted}")
         return
     
     print(f"\nCiphertext length: {len(cipher_bytes)} bytes")
@@ -268,11 +486,30 @@ def main():
             print()
         return
     
-    # Step 2: Analyze patterns
-    likely_lengths = analyze_repeating_patterns(cipher_bytes)
+    # Step 2: Rank key lengths
+    ranking = rank_key_lengths(cipher_bytes, 1, 20)
+    likely_lengths = [key_len for key_len, _, _, _ in ranking]
+    # Lengths too long to rank on a short ciphertext are still tried last
+    likely_lengths += [key_len for key_len in range(1, 21) if key_len not in likely_lengths]
+    
+    # The crib may not be at position 0: check every placement and key length,
+    # and go with a placement elsewhere only if it clearly beats the runner-up
+    crib_results = search_cribs(cipher_bytes, {known_plain: (known_plain.encode('utf-8'), ANCHOR_ANY)},
+                                key_lengths=likely_lengths, top=10, verbose=False)
+    if crib_results:
+        key_len, key, known, support, score, decrypted = crib_results[0]
+        runner_up = next((r[4][0] for r in crib_results[1:] if r[0] % key_len), 0.0)
+        if all(offset != 0 for _, offset in support) and score[0] >= CRIB_MARGIN * runner_up:
+            print("\n" + "=" * 80)
+            print(f"BEST RESULT (crib found at offset {support[0][1]})")
+            print("=" * 80)
+            print(f"Key: '{key.decode('utf-8', errors='ignore')}' ({key.hex()})")
+            print(f"Key length: {key_len} bytes")
+            print(f"Decrypted: {decrypted.decode('utf-8', errors='replace')}")
+            return
     
-    # Step 3: Try repeating key
-    repeating_results = find_repeating_key(cipher_bytes, known_plain, max_key_length=20)
+    # Step 3: Try repeating key, most likely lengths first
+    repeating_results = find_repeating_key(cipher_bytes, known_plain, key_lengths=likely_lengths)
     
     if repeating_results:
         # Find the most likely key (shortest that gives valid result)